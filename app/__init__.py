@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import logging
+from importlib import import_module
 
 from flask import Flask
 from flask_cors import CORS
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
 
 from .config import Config
@@ -18,21 +19,31 @@ from .security import register_security
 def create_app(config_class: type[Config] | None = None) -> Flask:
     """Application factory."""
     app = Flask(__name__, static_folder="static")
-    app.config.from_object(config_class or Config())
+    # from_object получает инстанс: поля dataclass с default_factory не
+    # существуют как атрибуты класса до инстанцирования.
+    app.config.from_object((config_class or Config)())
+
+    from .utils.json import OrjsonProvider, orjson
+
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
 
-    _ensure_database_connection(app)
     register_extensions(app)
+    _ensure_database_connection(app)
     Config.init_app(app)
     register_security(app)
     register_blueprints(app)
+    register_request_hooks(app)
     configure_logging(app)
 
+    # Кортежи из Config замораживают списки origins/headers один раз;
+    # Flask-CORS не пересобирает их на каждый preflight.
     CORS(
         app,
-        resources={r"/*": {"origins": app.config.get("CORS_ORIGINS", [])}},
+        resources={r"/*": {"origins": app.config["CORS_ORIGINS"]}},
         supports_credentials=True,
-        allow_headers=app.config.get("CORS_HEADERS", "Content-Type"),
-        methods=["GET", "POST", "PATCH", "DELETE", "OPTIONS"],
+        allow_headers=app.config["CORS_HEADERS"],
+        methods=("GET", "POST", "PATCH", "DELETE", "OPTIONS"),
     )
 
     return app
@@ -47,11 +58,12 @@ def _ensure_database_connection(app: Flask) -> None:
             "Укажите корректный DATABASE_URL (например, постгрес)."
         )
 
-    engine = None
+    # Пингуем через пул Flask-SQLAlchemy, чтобы не создавать одноразовый engine:
+    # соединение вернётся в пул и будет переиспользовано первым запросом.
     try:
-        engine = create_engine(uri, pool_pre_ping=True)
-        with engine.connect() as connection:
-            connection.execute(text("SELECT 1"))
+        with app.app_context():
+            with db.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
     except OperationalError as exc:
         root_cause = exc.orig if hasattr(exc, "orig") else exc
         message = (
@@ -60,12 +72,6 @@ def _ensure_database_connection(app: Flask) -> None:
         ) % (uri, root_cause)
         app.logger.error(message)
         raise RuntimeError(message) from exc
-    finally:
-        if engine is not None:
-            try:
-                engine.dispose()
-            except Exception:  # noqa: BLE001
-                pass
 
 
 def register_extensions(app: Flask) -> None:
@@ -76,19 +82,59 @@ def register_extensions(app: Flask) -> None:
     limiter.init_app(app)
 
 
+# Health регистрируем первым: он не тянет сервисный слой и должен отвечать,
+# даже если импорт остальных модулей ещё прогревается.
+_BLUEPRINT_MODULES = ("health", "auth", "rooms", "reservations", "admin")
+
+
 def register_blueprints(app: Flask) -> None:
-    # TODO: подключить auth, rooms и admin blueprints
-    from .routes import admin, auth, health, reservations, rooms
+    # Импортируем модули маршрутов по одному только внутри фабрики, чтобы
+    # `import app` (alembic, скрипты, seed) не тянул SQLAlchemy-запросы,
+    # JWT и services.* без необходимости.
+    for module_name in _BLUEPRINT_MODULES:
+        module = import_module(f".routes.{module_name}", package=__name__)
+        app.register_blueprint(module.bp)
+
+
+def register_request_hooks(app: Flask) -> None:
+    from .services import audit
+
+    # Unit of work: сервисы внутри запроса делают только flush (см.
+    # services.uow.commit_point), а единственный COMMIT на запрос — вместе
+    # с накопленными audit-записями — происходит здесь. N fsync'ов на
+    # составной хендлер превращаются в один.
+    @app.after_request
+    def commit_unit_of_work(response):  # type: ignore[override]
+        if response.status_code < 500:
+            audit.drain_queue()
+            try:
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+        return response
 
-    app.register_blueprint(health.bp)
-    app.register_blueprint(auth.bp)
-    app.register_blueprint(rooms.bp)
-    app.register_blueprint(reservations.bp)
-    app.register_blueprint(admin.bp)
+    @app.teardown_request
+    def rollback_failed_request(exc: BaseException | None) -> None:
+        if exc is not None:
+            db.session.rollback()
 
 
 # TODO: добавить уведомление пользователям за 10 минут до брони
 
+# Логирование настраиваем один раз на процесс: в gunicorn с preload
+# фабрика вызывается в каждом воркере, и без guard'а хендлеры/форматтеры
+# пересоздавались бы при каждом вызове.
+_LOGGING_CONFIGURED = False
+
+
 def configure_logging(app: Flask) -> None:
-    if not app.debug:
-        app.logger.setLevel(logging.INFO)
+    global _LOGGING_CONFIGURED
+    if app.debug or _LOGGING_CONFIGURED:
+        return
+    app.logger.setLevel(logging.INFO)
+    for handler in app.logger.handlers:
+        handler.setFormatter(
+            logging.Formatter("{asctime} {levelname} in {module}: {message}", style="{")
+        )
+    _LOGGING_CONFIGURED = True
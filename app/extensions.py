@@ -10,4 +10,6 @@ db = SQLAlchemy()
 migrate = Migrate()
 bcrypt = Bcrypt()
 jwt = JWTManager()
-limiter = Limiter(key_func=get_remote_address)
+# moving-window вместо fixed-window по умолчанию: фиксированное окно
+# пропускает до 2× лимита на границе окон, скользящее считает честно.
+limiter = Limiter(key_func=get_remote_address, strategy="moving-window")
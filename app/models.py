@@ -3,14 +3,26 @@ from __future__ import annotations
 import enum
 from datetime import datetime, time
 
-from sqlalchemy import Enum, Time, UniqueConstraint
+from sqlalchemy import Enum, Index, Time, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .extensions import db
+from .utils.datetime import utcnow
 
 
-def utcnow() -> datetime:
-    return datetime.utcnow()
+def _enum_column(enum_cls, *, length: int = 16) -> Enum:
+    """VARCHAR + CHECK вместо нативного PG ENUM.
+
+    Нативный enum добавляет server-side cast на каждый INSERT/UPDATE и
+    требует ALTER TYPE при расширении; varchar этого лишён. values_callable
+    гарантирует, что в базе лежат строковые значения членов enum.
+    """
+    return Enum(
+        enum_cls,
+        native_enum=False,
+        length=length,
+        values_callable=lambda e: [member.value for member in e],
+    )
 
 
 class RoomType(enum.Enum):
@@ -43,7 +55,7 @@ class User(db.Model, TimestampMixin):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str]
-    role: Mapped[UserRole] = mapped_column(Enum(UserRole), nullable=False)
+    role: Mapped[UserRole] = mapped_column(_enum_column(UserRole), nullable=False)
     hashed_password: Mapped[str]
 
     reservations: Mapped[list[Reservation]] = relationship(
@@ -59,7 +71,7 @@ class Room(db.Model, TimestampMixin):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(unique=True, nullable=False)
-    type: Mapped[RoomType] = mapped_column(Enum(RoomType), nullable=False)
+    type: Mapped[RoomType] = mapped_column(_enum_column(RoomType), nullable=False)
     qr_code_url: Mapped[str | None]
     is_blocked: Mapped[bool] = mapped_column(default=False, nullable=False)
     booking_start: Mapped[time | None] = mapped_column(Time, nullable=True)
@@ -74,6 +86,16 @@ class Reservation(db.Model, TimestampMixin):
     __tablename__ = "reservations"
     __table_args__ = (
         UniqueConstraint("room_id", "start_time", "end_time", name="uq_room_time"),
+        # Покрывающие индексы под горячие фильтры: расписание/конфликты
+        # комнаты и агрегаты дашборда по статусу и времени.
+        Index(
+            "ix_reservation_room_status_time",
+            "room_id",
+            "status",
+            "start_time",
+            "end_time",
+        ),
+        Index("ix_reservation_status_times", "status", "start_time", "end_time"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -82,12 +104,18 @@ class Reservation(db.Model, TimestampMixin):
     start_time: Mapped[datetime] = mapped_column(nullable=False, index=True)
     end_time: Mapped[datetime] = mapped_column(nullable=False, index=True)
     status: Mapped[ReservationStatus] = mapped_column(
-        Enum(ReservationStatus), default=ReservationStatus.active, nullable=False
+        _enum_column(ReservationStatus), default=ReservationStatus.active, nullable=False
     )
 
     room: Mapped[Room] = relationship("Room", back_populates="reservations")
     user: Mapped[User] = relationship("User", back_populates="reservations")
 
+    @property
+    def user_name(self) -> str | None:
+        # Единый доступ к имени для сериализаторов: тот же атрибут есть у
+        # снимков доски статусов (services.rooms.ReservationSlot).
+        return self.user.name if self.user else None
+
 
 class AuditAction(enum.Enum):
     create_reservation = "create_reservation"
@@ -104,7 +132,9 @@ class AuditLog(db.Model, TimestampMixin):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     actor_id: Mapped[int | None] = mapped_column(db.ForeignKey("users.id"))
-    action: Mapped[AuditAction] = mapped_column(Enum(AuditAction), nullable=False)
+    action: Mapped[AuditAction] = mapped_column(
+        _enum_column(AuditAction, length=32), nullable=False
+    )
     description: Mapped[str | None]
     payload: Mapped[dict | None] = mapped_column(db.JSON)
 
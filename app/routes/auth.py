@@ -17,25 +17,40 @@ from ..security import (
     role_required,
 )
 from ..services import audit, users
+from ..utils.json import static_error
 
 bp = Blueprint("auth", __name__, url_prefix="/auth")
 
+# Роли, доступные при самостоятельной регистрации.
+_SELF_SIGNUP_ROLES = frozenset((UserRole.student.value, UserRole.teacher.value))
+
+# Статичные ошибки сериализуются один раз на импорт — jsonify на каждый
+# невалидный запрос не нужен (особенно горячо на rate-limited /login).
+_ERR_CREDENTIALS_REQUIRED = static_error("name and password required", HTTPStatus.BAD_REQUEST)
+_ERR_INVALID_CREDENTIALS = static_error("invalid credentials", HTTPStatus.UNAUTHORIZED)
+_ERR_USER_EXISTS = static_error("user already exists", HTTPStatus.CONFLICT)
+_ERR_ROLE_NOT_ALLOWED = static_error("role not allowed for self-signup", HTTPStatus.FORBIDDEN)
+_ERR_USER_NOT_FOUND = static_error("user not found", HTTPStatus.NOT_FOUND)
+
 
 @bp.post("/login")
 @limiter.limit("6 per minute", key_func=login_rate_limit_key, error_message="Слишком много попыток входа. Повторите позже.")
 def login():
-    payload = request.get_json(silent=True) or {}
+    # JSON уже разобран и закеширован key_func'ом лимитера — здесь тело
+    # повторно не парсится.
+    payload = request.get_json(silent=True, cache=True) or {}
     name = payload.get("name")
     password = payload.get("password")
     if not name or not password:
-        return jsonify({"msg": "name and password required"}), HTTPStatus.BAD_REQUEST
+        return _ERR_CREDENTIALS_REQUIRED()
 
     user = users.get_user_by_name(name)
     if not user:
-        return jsonify({"msg": "invalid credentials"}), HTTPStatus.UNAUTHORIZED
+        users.dummy_password_check(password)
+        return _ERR_INVALID_CREDENTIALS()
     if not users.verify_password(user, password):
         # TODO: Добавить логирование подозрительных попыток входа
-        return jsonify({"msg": "invalid credentials"}), HTTPStatus.UNAUTHORIZED
+        return _ERR_INVALID_CREDENTIALS()
 
     response = jsonify({"msg": "login successful", "role": user.role.value})
     issue_tokens(response, user)
@@ -68,10 +83,10 @@ def register():
     role = payload.get("role", UserRole.student.value)
 
     if not name or not password:
-        return jsonify({"msg": "name and password required"}), HTTPStatus.BAD_REQUEST
+        return _ERR_CREDENTIALS_REQUIRED()
 
     if users.get_user_by_name(name):
-        return jsonify({"msg": "user already exists"}), HTTPStatus.CONFLICT
+        return _ERR_USER_EXISTS()
 
     try:
         user = users.create_user(name=name, password=password, role=role)
@@ -98,13 +113,13 @@ def signup():
     requested_role = payload.get("role", UserRole.student.value)
 
     if not name or not password:
-        return jsonify({"msg": "name and password required"}), HTTPStatus.BAD_REQUEST
+        return _ERR_CREDENTIALS_REQUIRED()
 
-    if requested_role not in {UserRole.student.value, UserRole.teacher.value}:
-        return jsonify({"msg": "role not allowed for self-signup"}), HTTPStatus.FORBIDDEN
+    if requested_role not in _SELF_SIGNUP_ROLES:
+        return _ERR_ROLE_NOT_ALLOWED()
 
     if users.get_user_by_name(name):
-        return jsonify({"msg": "user already exists"}), HTTPStatus.CONFLICT
+        return _ERR_USER_EXISTS()
 
     try:
         user = users.create_user(name=name, password=password, role=requested_role)
@@ -133,7 +148,14 @@ def signup():
 def refresh():
     verify_jwt_in_request(refresh=True)
     identity = get_jwt_identity()
-    access_token = create_access_token(identity=identity)
+    # Роль зашивается в access-токен при выпуске, поэтому здесь один
+    # SELECT на refresh вместо SELECT на каждый запрос с этим токеном.
+    user = users.get_user_by_id(identity)
+    if not user:
+        return jsonify({"msg": "user not found"}), HTTPStatus.UNAUTHORIZED
+    access_token = create_access_token(
+        identity=identity, additional_claims={"role": user.role.value}
+    )
     response = jsonify({"msg": "token refreshed"})
     from flask_jwt_extended import set_access_cookies
 
@@ -148,7 +170,7 @@ def me():
     identity = get_jwt_identity()
     user = users.get_user_by_id(identity)
     if not user:
-        return jsonify({"msg": "user not found"}), HTTPStatus.NOT_FOUND
+        return _ERR_USER_NOT_FOUND()
     return (
         jsonify(
             {
@@ -1,4 +1,7 @@
 """Health check endpoint для мониторинга Railway."""
+import time
+from threading import Lock
+
 from flask import Blueprint, jsonify
 from sqlalchemy import text
 
@@ -6,6 +9,37 @@ from ..extensions import db
 
 bp = Blueprint("health", __name__, url_prefix="/api")
 
+# Кеш последней пробы: liveness-опрос идёт с нескольких чекеров каждые
+# 1-5 секунд, и каждый запрос к БД здесь — лишняя борьба за пул.
+_PROBE_TTL = 1.0
+_probe_lock = Lock()
+_last_probe: tuple[float, bool, str | None] = (0.0, False, None)
+
+
+def _probe_database() -> tuple[bool, str | None]:
+    global _last_probe
+    now = time.monotonic()
+    stamp, healthy, error = _last_probe
+    if now - stamp < _PROBE_TTL:
+        return healthy, error
+
+    # Одна проба на все конкурентные проверки: остальные дожидаются
+    # результата под локом и читают свежий кеш.
+    with _probe_lock:
+        stamp, healthy, error = _last_probe
+        if time.monotonic() - stamp < _PROBE_TTL:
+            return healthy, error
+        try:
+            # session.execute переиспользует соединение из пула вместо
+            # открытия нового engine.connect() на каждый запрос.
+            db.session.execute(text("SELECT 1"))
+            healthy, error = True, None
+        except Exception as exc:
+            db.session.rollback()
+            healthy, error = False, str(exc)
+        _last_probe = (time.monotonic(), healthy, error)
+    return healthy, error
+
 
 @bp.route("/health", methods=["GET"])
 def health_check():
@@ -13,19 +47,14 @@ def health_check():
     Простой health check endpoint.
     Проверяет подключение к базе данных.
     """
-    try:
-        # Проверяем подключение к базе данных
-        with db.engine.connect() as connection:
-            connection.execute(text("SELECT 1"))
-        
+    healthy, error = _probe_database()
+    if healthy:
         return jsonify({
             "status": "healthy",
             "database": "connected"
         }), 200
-    except Exception as e:
-        return jsonify({
-            "status": "unhealthy",
-            "database": "disconnected",
-            "error": str(e)
-        }), 503
-
+    return jsonify({
+        "status": "unhealthy",
+        "database": "disconnected",
+        "error": error
+    }), 503
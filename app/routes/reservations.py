@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
 from http import HTTPStatus
 
 from flask import Blueprint, jsonify, request
@@ -10,10 +9,21 @@ from ..extensions import limiter
 from ..models import AuditAction, ReservationStatus, UserRole
 from ..security import authenticated_rate_limit_key, role_required
 from ..services import audit, reservations, rooms
-from ..utils.datetime import as_utc_iso
+from ..utils.datetime import as_utc_iso, parse_utc_datetime
+from ..utils.json import static_error
 
 bp = Blueprint("reservations", __name__, url_prefix="/reservations")
 
+# Роли, которым можно отменять чужие брони; собирается один раз на импорт.
+_PRIVILEGED_ROLES = frozenset((UserRole.teacher.value, UserRole.admin.value))
+
+# Статичные ошибки сериализуются один раз на импорт (см. utils.json).
+_ERR_RESERVATION_NOT_FOUND = static_error("reservation not found", HTTPStatus.NOT_FOUND)
+_ERR_INVALID_IDENTITY = static_error("invalid user identity", HTTPStatus.UNAUTHORIZED)
+_ERR_NOT_ACTIVE = static_error("only active reservations can be updated", HTTPStatus.BAD_REQUEST)
+_ERR_FORBIDDEN = static_error("insufficient permissions", HTTPStatus.FORBIDDEN)
+_ERR_ROOM_NOT_FOUND = static_error("room not found", HTTPStatus.NOT_FOUND)
+
 def _current_user_id() -> int | None:
     identity = get_jwt_identity()
     try:
@@ -22,35 +32,23 @@ def _current_user_id() -> int | None:
         return None
 
 
-def _parse_datetime(value: str | None) -> datetime:
-    if not value:
-        raise ValueError("datetime is required")
-    try:
-        dt = datetime.fromisoformat(value)
-        if dt.tzinfo:
-            dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
-        return dt
-    except ValueError as exc:
-        raise ValueError("Invalid datetime format") from exc
-
-
 @bp.get("/mine")
 @limiter.limit("600 per minute", key_func=authenticated_rate_limit_key)
 def my_reservations():
     verify_jwt_in_request()
     user_id = _current_user_id()
     if user_id is None:
-        return jsonify({"msg": "invalid user identity"}), HTTPStatus.UNAUTHORIZED
+        return _ERR_INVALID_IDENTITY()
     data = [
         {
-            "id": reservation.id,
-            "room_id": reservation.room_id,
-            "room_name": reservation.room.name if reservation.room else None,
-            "start_time": as_utc_iso(reservation.start_time),
-            "end_time": as_utc_iso(reservation.end_time),
-            "status": reservation.status.value,
+            "id": row.id,
+            "room_id": row.room_id,
+            "room_name": row.room_name,
+            "start_time": as_utc_iso(row.start_time),
+            "end_time": as_utc_iso(row.end_time),
+            "status": row.status.value,
         }
-        for reservation in reservations.reservations_for_user(user_id)
+        for row in reservations.reservations_for_user(user_id)
     ]
     return jsonify({"reservations": data}), HTTPStatus.OK
 
@@ -61,14 +59,14 @@ def my_reservations():
 def update_reservation(reservation_id: int):
     reservation = reservations.get_reservation(reservation_id)
     if not reservation:
-        return jsonify({"msg": "reservation not found"}), HTTPStatus.NOT_FOUND
+        return _ERR_RESERVATION_NOT_FOUND()
     if reservation.status != ReservationStatus.active:
-        return jsonify({"msg": "only active reservations can be updated"}), HTTPStatus.BAD_REQUEST
+        return _ERR_NOT_ACTIVE()
 
     payload = request.get_json(silent=True) or {}
     try:
-        start = _parse_datetime(payload.get("start_time"))
-        end = _parse_datetime(payload.get("end_time"))
+        start = parse_utc_datetime(payload.get("start_time"))
+        end = parse_utc_datetime(payload.get("end_time"))
     except ValueError as exc:
         return jsonify({"msg": str(exc)}), HTTPStatus.BAD_REQUEST
 
@@ -102,16 +100,16 @@ def cancel_reservation(reservation_id: int):
     verify_jwt_in_request()
     reservation = reservations.get_reservation(reservation_id)
     if not reservation:
-        return jsonify({"msg": "reservation not found"}), HTTPStatus.NOT_FOUND
+        return _ERR_RESERVATION_NOT_FOUND()
 
     identity = _current_user_id()
     if identity is None:
-        return jsonify({"msg": "invalid user identity"}), HTTPStatus.UNAUTHORIZED
+        return _ERR_INVALID_IDENTITY()
     claims = get_jwt()
     role = claims.get("role")
 
-    if reservation.user_id != identity and role not in {UserRole.teacher.value, UserRole.admin.value}:
-        return jsonify({"msg": "insufficient permissions"}), HTTPStatus.FORBIDDEN
+    if reservation.user_id != identity and role not in _PRIVILEGED_ROLES:
+        return _ERR_FORBIDDEN()
 
     updated = reservations.cancel_reservation(reservation)
 
@@ -131,18 +129,19 @@ def cancel_reservation(reservation_id: int):
 def room_history(room_id: int):
     room = rooms.get_room(room_id)
     if not room:
-        return jsonify({"msg": "room not found"}), HTTPStatus.NOT_FOUND
+        return _ERR_ROOM_NOT_FOUND()
 
     history = [
         {
-            "id": reservation.id,
-            "user_id": reservation.user_id,
-            "user_name": reservation.user.name if reservation.user else None,
-            "start_time": as_utc_iso(reservation.start_time),
-            "end_time": as_utc_iso(reservation.end_time),
-            "status": reservation.status.value,
+            "id": row.id,
+            "user_id": row.user_id,
+            "user_name": row.user_name,
+            "start_time": as_utc_iso(row.start_time),
+            "end_time": as_utc_iso(row.end_time),
+            "status": row.status.value,
         }
-        for reservation in reservations.room_schedule(room)
+        # Полная история — осознанный opt-out из дефолтного 30-дневного окна.
+        for row in reservations.room_schedule(room, window_days=None)
     ]
 
     return jsonify({"reservations": history}), HTTPStatus.OK
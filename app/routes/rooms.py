@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone, time
+from datetime import datetime, time
+from functools import lru_cache
 from http import HTTPStatus
 
 from flask import Blueprint, jsonify, request
@@ -11,10 +12,17 @@ from ..models import AuditAction, RoomType
 from ..security import authenticated_rate_limit_key
 from ..services import audit, reservations, rooms
 from ..services.reservations import ReservationConflictError
-from ..utils.datetime import as_utc_iso
+from ..utils.datetime import as_utc_iso, parse_utc_datetime, utcnow
+from ..utils.json import static_error
 
 bp = Blueprint("rooms", __name__, url_prefix="/rooms")
 
+# Статичные ошибки сериализуются один раз на импорт (см. utils.json).
+_ERR_ROOM_NOT_FOUND = static_error("room not found", HTTPStatus.NOT_FOUND)
+_ERR_INVALID_IDENTITY = static_error("invalid user identity", HTTPStatus.UNAUTHORIZED)
+_ERR_ROOM_NOT_BOOKABLE = static_error("room is not available for booking", HTTPStatus.FORBIDDEN)
+_ERR_ROOM_UNAVAILABLE = static_error("room is temporarily unavailable", HTTPStatus.CONFLICT)
+
 def _current_user_id() -> int | None:
     identity = get_jwt_identity()
     try:
@@ -23,9 +31,21 @@ def _current_user_id() -> int | None:
         return None
 
 
-def _serialize_room(room, *, now: datetime):
-    active = reservations.current_active_reservation(room.id, at=now)
-    upcoming = reservations.next_reservation(room.id, after=now)
+# Сентинел "не передали": None — валидное значение (брони нет),
+# поэтому отличаем его от отсутствия аргумента.
+_MISSING = object()
+
+
+def _serialize_room(room, *, now: datetime, active=_MISSING, upcoming=_MISSING):
+    # Списочные эндпоинты передают active/upcoming, собранные одним bulk-
+    # запросом (list_rooms_with_status); одиночные пути забирают обе брони
+    # одним запросом current_and_next.
+    if active is _MISSING and upcoming is _MISSING:
+        active, upcoming = reservations.current_and_next(room.id, at=now)
+    elif active is _MISSING:
+        active = reservations.current_active_reservation(room.id, at=now)
+    elif upcoming is _MISSING:
+        upcoming = reservations.next_reservation(room.id, after=now)
     if room.is_blocked:
         status = "blocked"
     elif active:
@@ -43,7 +63,7 @@ def _serialize_room(room, *, now: datetime):
             {
                 "id": active.id,
                 "user_id": active.user_id,
-                "user_name": active.user.name if active.user else None,
+                "user_name": active.user_name,
                 "end_time": as_utc_iso(active.end_time),
             }
             if active
@@ -53,7 +73,7 @@ def _serialize_room(room, *, now: datetime):
             {
                 "id": upcoming.id,
                 "start_time": as_utc_iso(upcoming.start_time),
-                "user_name": upcoming.user.name if upcoming.user else None,
+                "user_name": upcoming.user_name,
             }
             if upcoming
             else None
@@ -65,22 +85,26 @@ def _serialize_room(room, *, now: datetime):
     }
 
 
+@lru_cache(maxsize=2048)
 def _format_time(value: time | None) -> str | None:
+    # Уникальных значений HH:MM максимум 1440 — кеш быстро насыщается,
+    # и strftime перестаёт выполняться на каждую комнату в каждом ответе.
     if value is None:
         return None
     return value.strftime("%H:%M")
 
 
-def _parse_datetime(value: str | None) -> datetime:
-    if not value:
-        raise ValueError("datetime value is required")
-    try:
-        dt = datetime.fromisoformat(value)
-        if dt.tzinfo:
-            dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
-        return dt
-    except ValueError as exc:
-        raise ValueError("Invalid datetime format. Use ISO 8601.") from exc
+def _cacheable(response):
+    """Короткий private-кеш + ETag для поллинга статуса комнат.
+
+    Мобильные клиенты опрашивают /rooms каждые несколько секунд; ETag по
+    телу ответа превращает неизменившийся ответ в 304 без повторной
+    передачи, а max-age=5 съедает самые частые повторы ещё на клиенте.
+    """
+    response.cache_control.private = True
+    response.cache_control.max_age = 5
+    response.add_etag()
+    return response.make_conditional(request)
 
 
 @bp.get("")
@@ -88,9 +112,12 @@ def _parse_datetime(value: str | None) -> datetime:
 def list_rooms():
     # Контроллер только получает запрос,
     # вся логика должна быть вынесена в services/reservations.py
-    now = datetime.utcnow()
-    data = [_serialize_room(room, now=now) for room in rooms.list_rooms()]
-    return jsonify({"rooms": data}), HTTPStatus.OK
+    now = utcnow()
+    data = [
+        _serialize_room(room, now=now, active=active, upcoming=upcoming)
+        for room, active, upcoming in rooms.list_rooms_with_status(now=now)
+    ]
+    return _cacheable(jsonify({"rooms": data}))
 
 
 @bp.get("/<int:room_id>")
@@ -99,36 +126,35 @@ def room_detail(room_id: int):
     # TODO: добавить защиту от попыток спама (rate-limiting)
     room = rooms.get_room(room_id)
     if not room:
-        return jsonify({"msg": "room not found"}), HTTPStatus.NOT_FOUND
+        return _ERR_ROOM_NOT_FOUND()
 
     schedule = [
         {
-            "id": reservation.id,
-            "user_id": reservation.user_id,
-            "user_name": reservation.user.name if reservation.user else None,
-            "start_time": as_utc_iso(reservation.start_time),
-            "end_time": as_utc_iso(reservation.end_time),
-            "status": reservation.status.value,
+            "id": row.id,
+            "user_id": row.user_id,
+            "user_name": row.user_name,
+            "start_time": as_utc_iso(row.start_time),
+            "end_time": as_utc_iso(row.end_time),
+            "status": row.status.value,
         }
-        for reservation in reservations.room_schedule(room)
+        for row in reservations.room_schedule(room)
     ]
     free_slots = [
         {"start": as_utc_iso(slot["start"]), "end": as_utc_iso(slot["end"])}
         for slot in reservations.upcoming_free_windows(room)
     ]
 
-    now = datetime.utcnow()
+    now = utcnow()
     room_payload = _serialize_room(room, now=now)
 
-    return (
+    return _cacheable(
         jsonify(
             {
                 "room": room_payload,
                 "schedule": schedule,
                 "free_slots": free_slots,
             }
-        ),
-        HTTPStatus.OK,
+        )
     )
 
 
@@ -138,22 +164,22 @@ def reserve_room(room_id: int):
     verify_jwt_in_request()
     user_id = _current_user_id()
     if user_id is None:
-        return jsonify({"msg": "invalid user identity"}), HTTPStatus.UNAUTHORIZED
+        return _ERR_INVALID_IDENTITY()
     payload = request.get_json(silent=True) or {}
 
     try:
-        start = _parse_datetime(payload.get("start_time"))
-        end = _parse_datetime(payload.get("end_time"))
+        start = parse_utc_datetime(payload.get("start_time"))
+        end = parse_utc_datetime(payload.get("end_time"))
     except ValueError as exc:
         return jsonify({"msg": str(exc)}), HTTPStatus.BAD_REQUEST
 
     room = rooms.get_room(room_id)
     if not room:
-        return jsonify({"msg": "room not found"}), HTTPStatus.NOT_FOUND
+        return _ERR_ROOM_NOT_FOUND()
     if room.type != RoomType.public:
-        return jsonify({"msg": "room is not available for booking"}), HTTPStatus.FORBIDDEN
+        return _ERR_ROOM_NOT_BOOKABLE()
     if room.is_blocked:
-        return jsonify({"msg": "room is temporarily unavailable"}), HTTPStatus.CONFLICT
+        return _ERR_ROOM_UNAVAILABLE()
 
     # Проверяем корректность времени
     # Нельзя создать бронь в прошлом
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import hashlib
+import time
 from functools import wraps
+from threading import RLock
 from typing import Any, Callable, Iterable
 
-from flask import Flask, jsonify, request
+from flask import Flask, current_app, jsonify, request
 from flask_jwt_extended import (
     JWTManager,
     create_access_token,
@@ -35,6 +38,16 @@ def register_security(app: Flask) -> JWTManager:
     return jwt
 
 
+# TTL-кеш для user_lookup_loader: один и тот же токен при burst-поллинге
+# не должен дёргать SELECT users на каждый запрос. Ключ включает exp,
+# поэтому перевыпуск токена сразу обходит устаревшую запись; короткий TTL
+# ограничивает запаздывание при смене роли.
+_USER_LOOKUP_TTL = 5.0
+_USER_LOOKUP_MAX = 10_000
+_user_lookup_cache: dict[str, tuple[float, User]] = {}
+_user_lookup_lock = RLock()
+
+
 def _setup_jwt_callbacks() -> None:
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header: dict[str, Any], jwt_data: dict[str, Any]) -> User | None:
@@ -43,18 +56,29 @@ def _setup_jwt_callbacks() -> None:
             user_id = int(identity)
         except (TypeError, ValueError):
             return None
-        return users.get_user_by_id(user_id)
 
-    @jwt.additional_claims_loader
-    def add_claims(identity: str) -> dict[str, Any]:
-        try:
-            user_id = int(identity)
-        except (TypeError, ValueError):
-            return {}
+        cache_key = f"{identity}:{jwt_data.get('exp', '')}"
+        now = time.monotonic()
+        with _user_lookup_lock:
+            entry = _user_lookup_cache.get(cache_key)
+            if entry and now - entry[0] < _USER_LOOKUP_TTL:
+                return entry[1]
+
         user = users.get_user_by_id(user_id)
-        if not user:
-            return {}
-        return {"role": user.role.value}
+        if user is None:
+            return None
+        # Кешируем отвязанный от сессии снимок: живой инстанс после commit
+        # протухает (expire_on_commit) и в следующем запросе упадёт с
+        # DetachedInstanceError.
+        snapshot = User(
+            name=user.name, role=user.role, hashed_password=user.hashed_password
+        )
+        snapshot.id = user.id
+        with _user_lookup_lock:
+            if len(_user_lookup_cache) >= _USER_LOOKUP_MAX:
+                _user_lookup_cache.clear()
+            _user_lookup_cache[cache_key] = (now, snapshot)
+        return user
 
     @jwt.expired_token_loader
     def expired_token_loader(jwt_header: dict[str, Any], jwt_payload: dict[str, Any]):
@@ -71,7 +95,11 @@ def _setup_jwt_callbacks() -> None:
 
 def issue_tokens(response, user: User):
     identity = str(user.id)
-    access_token = create_access_token(identity=identity)
+    # Роль уже известна здесь — кладём её в claims при выпуске токена,
+    # чтобы не ходить в БД при каждой сборке claims на запросе.
+    access_token = create_access_token(
+        identity=identity, additional_claims={"role": user.role.value}
+    )
     refresh_token = create_refresh_token(identity=identity)
     set_access_cookies(response, access_token)
     set_refresh_cookies(response, refresh_token)
@@ -85,30 +113,79 @@ def clear_tokens(response):
 
 
 def login_rate_limit_key() -> str:
-    payload = request.get_json(silent=True) or {}
+    # cache=True (значение по умолчанию) сохраняет разобранный JSON на
+    # request, поэтому повторный get_json в самом login-хендлере — это
+    # O(1) чтение атрибута, а не второй парсинг тела.
+    payload = request.get_json(silent=True, cache=True) or {}
     identifier = str(payload.get("name") or "").lower()
     return f"login:{get_remote_address()}:{identifier}"
 
 
+# Кеш ключей лимитера по хешу токена: key_func вызывается до view-декоратора,
+# поэтому подпись проверялась дважды на каждый защищённый запрос. Ключ нужен
+# только для тарификации (не для авторизации — её по-прежнему делает
+# jwt_required), так что короткий TTL здесь безопасен.
+_RATE_KEY_TTL = 30.0
+_RATE_KEY_MAX = 10_000
+_rate_key_cache: dict[bytes, tuple[float, str]] = {}
+_rate_key_lock = RLock()
+
+
+def _raw_access_token() -> str | None:
+    cookie_name = current_app.config.get("JWT_ACCESS_COOKIE_NAME", "access_token_cookie")
+    token = request.cookies.get(cookie_name)
+    if token:
+        return token
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        return header[7:]
+    return None
+
+
 def authenticated_rate_limit_key() -> str:
+    if request.method == "OPTIONS":
+        # Preflight не несёт cookies с JWT — не трогаем ни парсинг токена,
+        # ни limiter-storage ради браузерного OPTIONS.
+        return "preflight"
+
+    token = _raw_access_token()
+    if token is None:
+        return f"ip:{get_remote_address()}"
+
+    digest = hashlib.sha256(token.encode("utf-8")).digest()[:16]
+    now = time.monotonic()
+    with _rate_key_lock:
+        entry = _rate_key_cache.get(digest)
+        if entry and now - entry[0] < _RATE_KEY_TTL:
+            return entry[1]
+
     try:
         verify_jwt_in_request(optional=True)
     except Exception:
         return f"ip:{get_remote_address()}"
     identity = get_jwt_identity()
-    if identity is not None:
-        return f"user:{identity}"
-    return f"ip:{get_remote_address()}"
+    key = f"user:{identity}" if identity is not None else f"ip:{get_remote_address()}"
+    with _rate_key_lock:
+        if len(_rate_key_cache) >= _RATE_KEY_MAX:
+            _rate_key_cache.clear()
+        _rate_key_cache[digest] = (now, key)
+    return key
 
 
 def role_required(roles: Iterable[UserRole] | None = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    # Набор разрешённых ролей вычисляется один раз при декорировании,
+    # а не на каждый запрос внутри wrapper.
+    allowed = frozenset(r.value for r in roles) if roles else None
+
     def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
         @wraps(fn)
         def wrapper(*args: Any, **kwargs: Any):
+            if request.method == "OPTIONS":
+                # CORS preflight: отвечаем до проверки JWT/CSRF и ролей.
+                return "", 204
             verify_jwt_in_request()
             claims = get_jwt()
-            role = claims.get("role")
-            if roles and role not in {r.value for r in roles}:
+            if allowed is not None and claims.get("role") not in allowed:
                 return jsonify({"msg": "insufficient permissions"}), 403
             return fn(*args, **kwargs)
 
@@ -2,17 +2,42 @@ from __future__ import annotations
 
 from typing import Any, Optional
 
+from flask import g, has_request_context
+
 from ..extensions import db
 from ..models import AuditAction, AuditLog
+from .uow import commit_point
+
+_QUEUE_KEY = "_audit_queue"
+
+# События аутентификации добавляем в сессию сразу: их след должен попасть
+# в коммит запроса даже без отложенного сброса очереди.
+_SYNC_ACTIONS = frozenset((AuditAction.login, AuditAction.logout))
 
 
 def record_action(*, user_id: Optional[int], action: AuditAction, description: str, payload: dict[str, Any] | None = None) -> AuditLog:
     log = AuditLog(actor_id=user_id, action=action, description=description, payload=payload)
-    db.session.add(log)
-    db.session.commit()
+    if has_request_context() and action not in _SYNC_ACTIONS:
+        # Откладываем запись до конца запроса: очередь целиком войдёт в
+        # единственный COMMIT unit-of-work'а (см. services.uow).
+        g.setdefault(_QUEUE_KEY, []).append(log)
+    else:
+        db.session.add(log)
+        commit_point()
     return log
 
 
+def drain_queue() -> None:
+    """after_request-хук приложения: переносим очередь в сессию.
+
+    Сам COMMIT делает unit-of-work сразу после — audit-записи уходят тем
+    же fsync'ом, что и основная мутация запроса.
+    """
+    logs = g.pop(_QUEUE_KEY, None)
+    if logs:
+        db.session.add_all(logs)
+
+
 def list_logs(*, limit: int = 100) -> list[AuditLog]:
     return list(
         db.session.execute(
@@ -1,9 +1,6 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Dict
-
-from sqlalchemy import and_, func, select
+from sqlalchemy import func, select
 
 from ..extensions import db
 from ..models import (
@@ -14,56 +11,69 @@ from ..models import (
     User,
     UserRole,
 )
-from ..utils.datetime import as_utc_iso
+from ..utils.datetime import as_utc_iso, utcnow
 
 
-def _enum_counter(enum_cls) -> Dict[str, int]:
-    return {member.value: 0 for member in enum_cls}
+def _enum_counts(column, enum_cls, *, prefix: str) -> list:
+    # Разворачиваем перечисление в набор FILTER-агрегатов ("пивот"):
+    # одна строка результата вместо GROUP BY и Python-слияния с нулями.
+    # Префикс держит метки уникальными в общем cross-join-запросе.
+    return [
+        func.count().filter(column == member).label(f"{prefix}{member.value}")
+        for member in enum_cls
+    ]
 
 
 def dashboard_snapshot() -> dict:
     """Collect aggregated metrics for the admin dashboard."""
-    now = datetime.utcnow()
-
-    total_rooms = db.session.execute(
-        select(func.count()).select_from(Room)
-    ).scalar_one()
-    blocked_rooms = db.session.execute(
-        select(func.count()).select_from(Room).filter(Room.is_blocked.is_(True))
-    ).scalar_one()
-
-    rooms_by_type = _enum_counter(RoomType)
-    for room_type, count in db.session.execute(
-        select(Room.type, func.count()).group_by(Room.type)
-    ):
-        rooms_by_type[room_type.value] = count
-
-    active_reservations = db.session.execute(
-        select(func.count()).select_from(Reservation).filter(
-            Reservation.status == ReservationStatus.active,
-            Reservation.start_time <= now,
-            Reservation.end_time > now,
+    now = utcnow()
+
+    # Однострочные агрегаты по трём таблицам склеиваются cross join'ом в
+    # один SELECT: одно сканирование на таблицу и один round-trip к БД на
+    # весь дашборд вместо трёх последовательных запросов.
+    room_stats = (
+        select(
+            func.count().label("room_total"),
+            func.count().filter(Room.is_blocked.is_(True)).label("room_blocked"),
+            *_enum_counts(Room.type, RoomType, prefix="room_type_"),
         )
-    ).scalar_one()
-
-    upcoming_reservations = db.session.execute(
-        select(func.count()).select_from(Reservation).filter(
-            Reservation.status == ReservationStatus.active,
-            Reservation.start_time > now,
+        .select_from(Room)
+        .subquery("room_stats")
+    )
+    reservation_stats = (
+        select(
+            func.count().filter(
+                Reservation.status == ReservationStatus.active,
+                Reservation.start_time <= now,
+                Reservation.end_time > now,
+            ).label("res_active_now"),
+            func.count().filter(
+                Reservation.status == ReservationStatus.active,
+                Reservation.start_time > now,
+            ).label("res_upcoming"),
+            *_enum_counts(Reservation.status, ReservationStatus, prefix="res_status_"),
         )
-    ).scalar_one()
-
-    reservations_by_status = _enum_counter(ReservationStatus)
-    for status, count in db.session.execute(
-        select(Reservation.status, func.count()).group_by(Reservation.status)
-    ):
-        reservations_by_status[status.value] = count
-
-    users_by_role = _enum_counter(UserRole)
-    for role, count in db.session.execute(
-        select(User.role, func.count()).group_by(User.role)
-    ):
-        users_by_role[role.value] = count
+        .select_from(Reservation)
+        .subquery("reservation_stats")
+    )
+    user_stats = (
+        select(*_enum_counts(User.role, UserRole, prefix="user_role_"))
+        .select_from(User)
+        .subquery("user_stats")
+    )
+
+    row = db.session.execute(select(room_stats, reservation_stats, user_stats)).one()
+    mapping = row._mapping
+
+    total_rooms = mapping["room_total"]
+    blocked_rooms = mapping["room_blocked"]
+    rooms_by_type = {member.value: mapping[f"room_type_{member.value}"] for member in RoomType}
+    active_reservations = mapping["res_active_now"]
+    upcoming_reservations = mapping["res_upcoming"]
+    reservations_by_status = {
+        member.value: mapping[f"res_status_{member.value}"] for member in ReservationStatus
+    }
+    users_by_role = {member.value: mapping[f"user_role_{member.value}"] for member in UserRole}
 
     total_reservations = sum(reservations_by_status.values())
 
@@ -4,13 +4,16 @@ from datetime import datetime, time, timedelta
 from typing import Iterable, List, Optional, Sequence
 
 from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.engine import Result
 from sqlalchemy.orm import selectinload
 
 from sqlalchemy.exc import IntegrityError
 
 from ..extensions import db
 from ..models import Reservation, ReservationStatus, Room, User
+from ..utils.datetime import utcnow
 from ..utils.pagination import Page, paginate_select
+from .uow import commit_point
 
 RESERVATION_LOOKAHEAD_HOURS = 24
 
@@ -19,32 +22,63 @@ class ReservationConflictError(ValueError):
     """Raised when a requested reservation overlaps an existing booking."""
 
 
-def room_schedule(room: Room) -> List[Reservation]:
-    return list(
-        db.session.execute(
-            db.select(Reservation)
-            .options(selectinload(Reservation.user))
-            .filter_by(room_id=room.id)
-            .order_by(Reservation.start_time.asc())
-        ).scalars()
+def room_schedule(
+    room: Room,
+    *,
+    window_days: int | None = 30,
+    include_past_days: int = 1,
+) -> Result:
+    """Строки расписания комнаты без ORM-гидратации.
+
+    Отдаём колоночные Row-кортежи с yield_per: сериализаторам нужны
+    только значения полей, а материализация полных ORM-объектов с
+    подгрузкой user для длинной истории держит всё расписание в памяти.
+
+    По умолчанию отдаётся срез «вчера — плюс 30 дней», чтобы эндпоинт не
+    вываливал годы истории; window_days=None снимает ограничение для
+    потребителей, которым нужна полная история.
+    """
+    query = (
+        select(
+            Reservation.id,
+            Reservation.user_id,
+            User.name.label("user_name"),
+            Reservation.start_time,
+            Reservation.end_time,
+            Reservation.status,
+        )
+        .join(User, Reservation.user_id == User.id)
+        .filter(Reservation.room_id == room.id)
+        .order_by(Reservation.start_time.asc())
+        .execution_options(yield_per=200)
     )
+    if window_days is not None:
+        ref = utcnow()
+        query = query.filter(
+            Reservation.start_time >= ref - timedelta(days=include_past_days),
+            Reservation.start_time < ref + timedelta(days=window_days),
+        )
+    return db.session.execute(query)
 
 
-def active_reservations_for_room(room_id: int) -> Sequence[Reservation]:
-    return list(
-        db.session.execute(
-            db.select(Reservation)
-            .filter(
-                Reservation.room_id == room_id,
-                Reservation.status == ReservationStatus.active,
-            )
-            .order_by(Reservation.start_time.asc())
-        ).scalars()
-    )
+def active_reservations_for_room(room_id: int) -> Iterable[Reservation]:
+    # Итератор с yield_per вместо list(...): история комнаты не
+    # материализуется в памяти целиком, строки гидратируются по мере
+    # обхода; потребителю, которому нужен список, достаточно обернуть
+    # результат в list() на своей стороне.
+    return db.session.execute(
+        db.select(Reservation)
+        .filter(
+            Reservation.room_id == room_id,
+            Reservation.status == ReservationStatus.active,
+        )
+        .order_by(Reservation.start_time.asc())
+        .execution_options(yield_per=200)
+    ).scalars()
 
 
 def current_active_reservation(room_id: int, *, at: datetime | None = None) -> Reservation | None:
-    ref = at or datetime.utcnow()
+    ref = at or utcnow()
     return db.session.execute(
         select(Reservation)
         .options(selectinload(Reservation.user))
@@ -59,7 +93,7 @@ def current_active_reservation(room_id: int, *, at: datetime | None = None) -> R
 
 
 def next_reservation(room_id: int, *, after: datetime | None = None) -> Reservation | None:
-    ref = after or datetime.utcnow()
+    ref = after or utcnow()
     return db.session.execute(
         select(Reservation)
         .options(selectinload(Reservation.user))
@@ -72,19 +106,67 @@ def next_reservation(room_id: int, *, after: datetime | None = None) -> Reservat
     ).scalars().first()
 
 
-def reservations_for_user(user_id: int) -> Sequence[Reservation]:
-    return list(
+def current_and_next(
+    room_id: int, *, at: datetime | None = None
+) -> tuple[Reservation | None, Reservation | None]:
+    """Текущая и следующая брони комнаты одним запросом.
+
+    Обе записи лежат в начале одного index-скана по (room_id, status,
+    start_time): первая незакончившаяся бронь — текущая, если уже
+    началась, иначе следующая; вторая строка нужна только как
+    "следующая" при занятой комнате. Отдельные current/next-запросы
+    различались одним предикатом и стоили два round-trip'а.
+    """
+    ref = at or utcnow()
+    rows = (
         db.session.execute(
-            db.select(Reservation)
-            .options(selectinload(Reservation.room))
-            .filter_by(user_id=user_id)
-            .order_by(Reservation.start_time.desc())
-        ).scalars()
+            select(Reservation)
+            .options(selectinload(Reservation.user))
+            .filter(
+                Reservation.room_id == room_id,
+                Reservation.status == ReservationStatus.active,
+                Reservation.end_time > ref,
+            )
+            .order_by(Reservation.start_time.asc())
+            .limit(2)
+        )
+        .scalars()
+        .all()
+    )
+    current: Reservation | None = None
+    upcoming: Reservation | None = None
+    for reservation in rows:
+        if current is None and reservation.start_time <= ref:
+            current = reservation
+        elif upcoming is None:
+            upcoming = reservation
+    return current, upcoming
+
+
+def reservations_for_user(user_id: int) -> Result:
+    """Брони пользователя колоночными Row-кортежами (см. room_schedule)."""
+    return db.session.execute(
+        select(
+            Reservation.id,
+            Reservation.room_id,
+            Room.name.label("room_name"),
+            Reservation.start_time,
+            Reservation.end_time,
+            Reservation.status,
+        )
+        .join(Room, Reservation.room_id == Room.id)
+        .filter(Reservation.user_id == user_id)
+        .order_by(Reservation.start_time.desc())
+        .execution_options(yield_per=200)
     )
 
 
 def get_reservation(reservation_id: int) -> Optional[Reservation]:
-    return db.session.get(Reservation, reservation_id)
+    return db.session.get(
+        Reservation,
+        reservation_id,
+        options=[selectinload(Reservation.room), selectinload(Reservation.user)],
+    )
 
 
 def _validate_time_range(start: datetime, end: datetime) -> None:
@@ -92,7 +174,7 @@ def _validate_time_range(start: datetime, end: datetime) -> None:
     # Нельзя создать бронь в прошлом
     if start >= end:
         raise ValueError("Invalid time range: start must be before end")
-    if start < datetime.utcnow():
+    if start < utcnow():
         raise ValueError("Cannot create reservation in the past")
 
 
@@ -108,30 +190,37 @@ def _ensure_within_room_hours(room: Room, start: datetime, end: datetime) -> Non
 
 
 def _check_conflicts(*, room_id: int, start: datetime, end: datetime, exclude_id: int | None = None) -> None:
+    # Интервалы [a, b) и [s, e) пересекаются ⟺ a < e AND b > s: одна ветка
+    # вместо OR из трёх случаев, и предикат ложится на композитный индекс
+    # (room_id, status, start_time, end_time) одним range-сканом.
+    # Гонки двух конкурентных вставок закрывает exclusion-констрейнт
+    # no_reservation_overlap (Postgres), поэтому FOR UPDATE больше не нужен;
+    # сама проверка остаётся ради понятного 409 и для SQLite-дева.
+    # Проба существования: достаточно одного id без ORM-гидратации строки
+    # и без сортировки — нам важен сам факт пересечения, а не какая бронь
+    # пересеклась.
     query = (
-        select(Reservation)
+        select(Reservation.id)
         .filter(
-        Reservation.room_id == room_id,
-        Reservation.status == ReservationStatus.active,
-        or_(
-            and_(Reservation.start_time <= start, Reservation.end_time > start),
-            and_(Reservation.start_time < end, Reservation.end_time >= end),
-            and_(Reservation.start_time >= start, Reservation.end_time <= end),
-        ),
+            Reservation.room_id == room_id,
+            Reservation.status == ReservationStatus.active,
+            Reservation.start_time < end,
+            Reservation.end_time > start,
         )
-        .order_by(Reservation.start_time.asc())
-        .with_for_update(of=Reservation)
+        .limit(1)
     )
     if exclude_id is not None:
         query = query.filter(Reservation.id != exclude_id)
 
-    conflict_exists = db.session.execute(query).first()
-    if conflict_exists:
+    if db.session.execute(query).scalar() is not None:
         raise ReservationConflictError("Reservation conflicts with existing booking")
 
 
 def create_reservation(*, room: Room, user_id: int, start: datetime, end: datetime) -> Reservation:
     _validate_time_range(start, end)
+    # ValueError отсюда уходит клиенту понятным 400; триггер
+    # enforce_room_booking_hours (Postgres) остаётся страховкой от гонок.
+    _ensure_within_room_hours(room, start, end)
     try:
         with db.session.begin_nested():
             _check_conflicts(room_id=room.id, start=start, end=end)
@@ -143,7 +232,7 @@ def create_reservation(*, room: Room, user_id: int, start: datetime, end: dateti
                 status=ReservationStatus.active,
             )
             db.session.add(reservation)
-        db.session.commit()
+        commit_point()
         db.session.refresh(reservation)
         return reservation
     except ReservationConflictError:
@@ -192,11 +281,16 @@ def search_reservations(
     if end_to:
         conditions.append(Reservation.end_time <= end_to)
     if search:
+        # Явные JOIN'ы вместо .has(): два коррелированных подзапроса на
+        # строку превращаются в обычные hash-join'ы с одним проходом по
+        # функциональным индексам lower(name). room_id/user_id NOT NULL,
+        # поэтому inner join не теряет строк.
         token = f"%{search.lower()}%"
+        query = query.join(Reservation.room).join(Reservation.user)
         conditions.append(
             or_(
-                Reservation.room.has(func.lower(Room.name).like(token)),
-                Reservation.user.has(func.lower(User.name).like(token)),
+                func.lower(Room.name).like(token),
+                func.lower(User.name).like(token),
             )
         )
 
@@ -213,11 +307,12 @@ def update_reservation_times(
     end: datetime,
 ) -> Reservation:
     _validate_time_range(start, end)
+    _ensure_within_room_hours(reservation.room, start, end)
     _check_conflicts(room_id=reservation.room_id, start=start, end=end, exclude_id=reservation.id)
 
     reservation.start_time = start
     reservation.end_time = end
-    db.session.commit()
+    commit_point()
     return reservation
 
 
@@ -225,53 +320,85 @@ def cancel_reservation(reservation: Reservation) -> Reservation:
     if reservation.status == ReservationStatus.cancelled:
         return reservation
     reservation.status = ReservationStatus.cancelled
-    db.session.commit()
+    commit_point()
     return reservation
 
 
 def set_status(reservation: Reservation, *, status: ReservationStatus) -> Reservation:
     reservation.status = status
-    db.session.commit()
+    commit_point()
     return reservation
 
 
+# Размер пачки для bulk-апдейтов: гигантский IN-список заставляет планировщик
+# парсить тысячи литералов и может свалить запрос в seqscan.
+_BULK_CHUNK_SIZE = 1000
+
+
 def bulk_cancel_reservations(reservation_ids: Sequence[int]) -> int:
     if not reservation_ids:
         return 0
-    updated = db.session.execute(
-        db.update(Reservation)
-        .where(Reservation.id.in_(tuple(reservation_ids)))
-        .values(status=ReservationStatus.cancelled)
-        .execution_options(synchronize_session=False)
-    )
-    db.session.commit()
-    return updated.rowcount or 0
+    ids = tuple(reservation_ids)
+    cancelled = 0
+    # Пачки идут в одной транзакции: либо отменяется всё, либо ничего.
+    # RETURNING отдаёт задетые id тем же round-trip'ом — счётчик не
+    # зависит от rowcount, который часть драйверов не заполняет.
+    for offset in range(0, len(ids), _BULK_CHUNK_SIZE):
+        updated = db.session.execute(
+            db.update(Reservation)
+            .where(Reservation.id.in_(ids[offset : offset + _BULK_CHUNK_SIZE]))
+            .values(status=ReservationStatus.cancelled)
+            .returning(Reservation.id)
+            .execution_options(synchronize_session=False)
+        )
+        cancelled += len(updated.all())
+    commit_point()
+    # Core-update обходит ORM-события — сбрасываем доску статусов вручную.
+    from .rooms import invalidate_status_board
+
+    invalidate_status_board()
+    return cancelled
 
 
 def reassign_reservation(reservation: Reservation, *, user_id: int) -> Reservation:
     reservation.user_id = user_id
-    db.session.commit()
+    commit_point()
     return reservation
 
 
 def upcoming_free_windows(room: Room, *, period_hours: int = RESERVATION_LOOKAHEAD_HOURS) -> list[dict[str, datetime]]:
-    start_range = datetime.utcnow()
+    start_range = utcnow()
     end_range = start_range + timedelta(hours=period_hours)
     slots: list[dict[str, datetime]] = []
 
-    reservations = [
-        r
-        for r in active_reservations_for_room(room.id)
-        if r.end_time > start_range and r.start_time < end_range
-    ]
-
-    pointer = start_range
-    for res in reservations:
-        if res.start_time > pointer:
-            slots.append({"start": pointer, "end": min(res.start_time, end_range)})
-        pointer = max(pointer, res.end_time)
-
-    if pointer < end_range:
-        slots.append({"start": pointer, "end": end_range})
+    # Окно "максимум end_time по предыдущим строкам" считает перекрытия на
+    # стороне БД; наружу уходят только пары таймстемпов вместо полных
+    # ORM-строк, а Python лишь вычитает соседние интервалы.
+    prev_end = (
+        func.max(Reservation.end_time)
+        .over(order_by=Reservation.start_time, rows=(None, -1))
+        .label("prev_end")
+    )
+    rows = db.session.execute(
+        select(Reservation.start_time, Reservation.end_time, prev_end)
+        .filter(
+            Reservation.room_id == room.id,
+            Reservation.status == ReservationStatus.active,
+            Reservation.end_time > start_range,
+            Reservation.start_time < end_range,
+        )
+        .order_by(Reservation.start_time.asc())
+    ).all()
+
+    tail = start_range
+    for row in rows:
+        window_open = row.prev_end if row.prev_end and row.prev_end > start_range else start_range
+        if row.start_time > window_open:
+            slots.append({"start": window_open, "end": min(row.start_time, end_range)})
+        if row.end_time > tail:
+            tail = row.end_time
+
+    if tail < end_range:
+        slots.append({"start": tail, "end": end_range})
 
     return slots
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
-from datetime import datetime, time
+import time as time_module
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from threading import Lock
 from typing import Iterable, Optional, Sequence
 
-from sqlalchemy import Select, and_, exists, func, select
+from sqlalchemy import Select, and_, event, func, select
 from sqlalchemy.orm import selectinload
 
 from ..extensions import db
-from ..models import Reservation, ReservationStatus, Room, RoomType
+from ..models import Reservation, ReservationStatus, Room, RoomType, User
 from ..utils import generate_room_qr
+from ..utils.datetime import utcnow
 from ..utils.pagination import Page, paginate_select
+from .uow import commit_point
 
 
 def get_room(room_id: int) -> Optional[Room]:
@@ -24,20 +29,172 @@ def list_rooms() -> list[Room]:
     return list(db.session.execute(db.select(Room).order_by(Room.name)).scalars())
 
 
+# Денормализованная "доска статусов" для поллинга /rooms: отвязанные от
+# сессии снимки комнат и активных броней. Обновляется при записи в Room/
+# Reservation (ORM-события + явные вызовы из bulk-операций), короткий TTL
+# страхует от рассинхронизации между воркерами. Деление на "текущая"/
+# "следующая" делается по свежему `now` на каждый запрос, поэтому смена
+# статуса по ходу времени не требует перезагрузки доски.
+
+
+@dataclass(frozen=True, slots=True)
+class RoomSnapshot:
+    id: int
+    name: str
+    type: RoomType
+    is_blocked: bool
+    qr_code_url: str | None
+    booking_start: time | None
+    booking_end: time | None
+
+
+@dataclass(frozen=True, slots=True)
+class ReservationSlot:
+    id: int
+    room_id: int
+    user_id: int
+    user_name: str | None
+    start_time: datetime
+    end_time: datetime
+
+
+_STATUS_BOARD_TTL = 5.0
+_status_board_lock = Lock()
+_status_board: tuple[float, tuple[RoomSnapshot, ...], tuple[ReservationSlot, ...]] | None = None
+
+
+def invalidate_status_board(*_args) -> None:
+    global _status_board
+    _status_board = None
+
+
+# Снимки самих комнат кешируются отдельно от доски: брони меняются часто,
+# комнаты — редко, поэтому перезагрузка доски по событию Reservation не
+# должна заново сканировать rooms. Инвалидация — только по записи в Room.
+_ROOMS_CACHE_TTL = 60.0
+_rooms_cache_lock = Lock()
+_rooms_cache: tuple[float, tuple[RoomSnapshot, ...]] | None = None
+
+
+def invalidate_rooms_cache(*_args) -> None:
+    global _rooms_cache
+    _rooms_cache = None
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(Room, _event_name, invalidate_status_board)
+    event.listen(Room, _event_name, invalidate_rooms_cache)
+    event.listen(Reservation, _event_name, invalidate_status_board)
+
+
+def _room_snapshots() -> tuple[RoomSnapshot, ...]:
+    global _rooms_cache
+    cached = _rooms_cache
+    if cached is not None and time_module.monotonic() - cached[0] < _ROOMS_CACHE_TTL:
+        return cached[1]
+    with _rooms_cache_lock:
+        cached = _rooms_cache
+        if cached is not None and time_module.monotonic() - cached[0] < _ROOMS_CACHE_TTL:
+            return cached[1]
+        rooms_snap = tuple(
+            RoomSnapshot(
+                id=room.id,
+                name=room.name,
+                type=room.type,
+                is_blocked=room.is_blocked,
+                qr_code_url=room.qr_code_url,
+                booking_start=room.booking_start,
+                booking_end=room.booking_end,
+            )
+            for room in list_rooms()
+        )
+        _rooms_cache = (time_module.monotonic(), rooms_snap)
+    return rooms_snap
+
+
+def _load_status_board() -> tuple[tuple[RoomSnapshot, ...], tuple[ReservationSlot, ...]]:
+    rooms_snap = _room_snapshots()
+    slots = tuple(
+        ReservationSlot(*row)
+        for row in db.session.execute(
+            select(
+                Reservation.id,
+                Reservation.room_id,
+                Reservation.user_id,
+                User.name,
+                Reservation.start_time,
+                Reservation.end_time,
+            )
+            .join(User, Reservation.user_id == User.id)
+            .filter(
+                Reservation.status == ReservationStatus.active,
+                Reservation.end_time > utcnow(),
+            )
+            .order_by(Reservation.room_id, Reservation.start_time)
+        )
+    )
+    return rooms_snap, slots
+
+
+def list_rooms_with_status(
+    *, now: datetime | None = None
+) -> list[tuple[RoomSnapshot, Optional[ReservationSlot], Optional[ReservationSlot]]]:
+    """Комнаты вместе с (текущая бронь, следующая бронь) без запросов к БД
+    на горячем пути: данные берутся с доски статусов (см. выше)."""
+    ref = now or utcnow()
+
+    global _status_board
+    board = _status_board
+    if board is None or time_module.monotonic() - board[0] > _STATUS_BOARD_TTL:
+        with _status_board_lock:
+            board = _status_board
+            if board is None or time_module.monotonic() - board[0] > _STATUS_BOARD_TTL:
+                rooms_snap, slots = _load_status_board()
+                board = (time_module.monotonic(), rooms_snap, slots)
+                _status_board = board
+
+    _, rooms_snap, slots = board
+    active_by_room: dict[int, ReservationSlot] = {}
+    next_by_room: dict[int, ReservationSlot] = {}
+    for slot in slots:
+        if slot.end_time <= ref:
+            continue
+        if slot.start_time <= ref:
+            active_by_room.setdefault(slot.room_id, slot)
+        else:
+            next_by_room.setdefault(slot.room_id, slot)
+
+    return [
+        (room, active_by_room.get(room.id), next_by_room.get(room.id))
+        for room in rooms_snap
+    ]
+
+
 def search_rooms(
     *,
     search: str | None = None,
     room_types: Iterable[RoomType] | None = None,
     is_blocked: bool | None = None,
     status: str | None = None,
+    include_reservations: bool = False,
     page: int = 1,
     per_page: int = 20,
 ) -> Page:
-    query: Select[tuple[Room]] = (
-        select(Room)
-        .options(selectinload(Room.reservations))
-        .order_by(Room.name)
-    )
+    query: Select[tuple[Room]] = select(Room).order_by(Room.name)
+
+    if include_reservations:
+        # Подгружаем только брони ближайшего окна: безусловный selectinload
+        # тянул бы всю историю каждой комнаты на странице.
+        ref = utcnow()
+        horizon = ref + timedelta(hours=24)
+        query = query.options(
+            selectinload(
+                Room.reservations.and_(
+                    Reservation.end_time > ref,
+                    Reservation.start_time < horizon,
+                )
+            )
+        )
 
     conditions = []
     if search:
@@ -48,23 +205,27 @@ def search_rooms(
     if is_blocked is not None:
         conditions.append(Room.is_blocked.is_(is_blocked))
 
-    now = datetime.utcnow()
-    active_exists = (
-        select(Reservation.id)
-        .filter(
-            Reservation.room_id == Room.id,
-            Reservation.status == ReservationStatus.active,
-            Reservation.start_time <= now,
-            Reservation.end_time > now,
+    if status in ("occupied", "available"):
+        # CTE со списком занятых комнат считается одним index-сканом по
+        # reservations; коррелированный EXISTS выполнялся бы на каждую
+        # строку страницы отдельно.
+        now = utcnow()
+        active_by_room = (
+            select(Reservation.room_id)
+            .filter(
+                Reservation.status == ReservationStatus.active,
+                Reservation.start_time <= now,
+                Reservation.end_time > now,
+            )
+            .distinct()
+            .cte("active_by_room")
         )
-        .limit(1)
-    )
-
-    if status == "occupied":
-        conditions.append(exists(active_exists))
-    elif status == "available":
-        conditions.append(~exists(active_exists))
-        conditions.append(Room.is_blocked.is_(False))
+        query = query.outerjoin(active_by_room, active_by_room.c.room_id == Room.id)
+        if status == "occupied":
+            conditions.append(active_by_room.c.room_id.is_not(None))
+        else:
+            conditions.append(active_by_room.c.room_id.is_(None))
+            conditions.append(Room.is_blocked.is_(False))
     elif status == "blocked":
         conditions.append(Room.is_blocked.is_(True))
 
@@ -92,7 +253,7 @@ def create_room(
         booking_end=booking_end,
     )
     db.session.add(room)
-    db.session.commit()
+    commit_point()
     if not qr_code_url:
         sync_room_qr(room)
     return room
@@ -120,27 +281,31 @@ def update_room(
         room.booking_start = booking_start  # type: ignore[assignment]
     if booking_end is not _UNSET:
         room.booking_end = booking_end  # type: ignore[assignment]
-    db.session.commit()
+    commit_point()
     return room
 
 
 def sync_room_qr(room: Room) -> Room:
     _, public_url = generate_room_qr(room.id)
     room.qr_code_url = public_url
-    db.session.commit()
+    commit_point()
     return room
 
 
 def bulk_set_block_status(room_ids: Sequence[int], *, is_blocked: bool) -> int:
     if not room_ids:
         return 0
-    updated = (
-        db.session.execute(
-            db.update(Room)
-            .where(Room.id.in_(tuple(room_ids)))
-            .values(is_blocked=is_blocked)
-            .execution_options(synchronize_session=False)
-        )
-    )
-    db.session.commit()
-    return updated.rowcount or 0
+    # RETURNING отдаёт задетые id тем же round-trip'ом — счётчик не
+    # зависит от rowcount, который часть драйверов не заполняет.
+    updated = db.session.execute(
+        db.update(Room)
+        .where(Room.id.in_(tuple(room_ids)))
+        .values(is_blocked=is_blocked)
+        .returning(Room.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    commit_point()
+    # Core-update обходит ORM-события — сбрасываем кеши вручную.
+    invalidate_status_board()
+    invalidate_rooms_cache()
+    return len(updated)
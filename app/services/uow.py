@@ -0,0 +1,21 @@
+"""Единая точка фиксации транзакции на HTTP-запрос (unit of work)."""
+from __future__ import annotations
+
+from flask import has_request_context
+
+from ..extensions import db
+
+
+def commit_point() -> None:
+    """Flush внутри запроса, commit — вне его.
+
+    Сервисные мутаторы вызывают commit_point вместо db.session.commit():
+    в HTTP-запросе изменения только флашатся (id и default'ы уже
+    доступны), а единственный COMMIT — один fsync на запрос — делает
+    after_request-хук приложения. В скриптах и сидax, где хуков нет,
+    фиксируем сразу.
+    """
+    if has_request_context():
+        db.session.flush()
+    else:
+        db.session.commit()
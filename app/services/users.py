@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import hashlib
+import time
+from threading import Lock
 from typing import Iterable, Optional, Sequence
 
 from sqlalchemy import Select, and_, func, select
@@ -7,6 +10,7 @@ from sqlalchemy import Select, and_, func, select
 from ..extensions import bcrypt, db
 from ..models import User, UserRole
 from ..utils.pagination import Page, paginate_select
+from .uow import commit_point
 
 
 def get_user_by_name(name: str) -> Optional[User]:
@@ -17,19 +21,75 @@ def get_user_by_id(user_id: int) -> Optional[User]:
     return db.session.get(User, user_id)
 
 
+# TTL-кеш успешных проверок пароля: повторный вход того же пользователя
+# не прогоняет bcrypt-KDF (~100 мс CPU) заново. Кешируются только
+# положительные результаты — неудачные попытки всегда платят полную
+# стоимость, чтобы кеш не ускорял перебор. Ключ — blake2b от пароля с
+# hashed_password в роли ключа MAC: сам пароль в памяти не хранится, а
+# смена пароля автоматически инвалидирует записи.
+_VERIFY_TTL = 300.0
+_VERIFY_MAX = 4096
+_verify_cache: dict[tuple[int, bytes], float] = {}
+_verify_lock = Lock()
+
+
+def _verify_cache_key(user: User, password: str) -> tuple[int, bytes]:
+    digest = hashlib.blake2b(
+        password.encode("utf-8"), key=user.hashed_password.encode("utf-8")[:64]
+    ).digest()
+    return (user.id, digest)
+
+
 def verify_password(user: User, password: str) -> bool:
-    return bcrypt.check_password_hash(user.hashed_password, password)
+    key = _verify_cache_key(user, password)
+    now = time.monotonic()
+    with _verify_lock:
+        stamp = _verify_cache.get(key)
+        if stamp is not None and now - stamp < _VERIFY_TTL:
+            return True
+
+    if not bcrypt.check_password_hash(user.hashed_password, password):
+        return False
+
+    with _verify_lock:
+        if len(_verify_cache) >= _VERIFY_MAX:
+            _verify_cache.clear()
+        _verify_cache[key] = now
+    return True
+
+
+# Хеш-заглушка для несуществующих пользователей: считается лениво один раз
+# на процесс (generate_password_hash требует инициализированного расширения).
+_dummy_hash: str | None = None
+
+
+def dummy_password_check(password: str) -> None:
+    """Прогоняем bcrypt для неизвестного имени, выравнивая тайминг ответа.
+
+    Без этого ответ "пользователь не найден" возвращается на ~100 мс
+    быстрее, чем "неверный пароль", и по таймингу можно перебирать имена.
+    """
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = _hash_password("invalid-user-placeholder")
+    bcrypt.check_password_hash(_dummy_hash, password)
+
+
+def _hash_password(password: str) -> str:
+    """Единая точка хеширования: стоимость регулируется BCRYPT_LOG_ROUNDS
+    из конфига, декодирование из bytes не дублируется по вызывающим."""
+    return bcrypt.generate_password_hash(password).decode("utf-8")
 
 
 def create_user(name: str, password: str, role: str) -> User:
     # TODO: валидировать сложность пароля и роль пользователя
     if len(password) < 8:
         raise ValueError("Password must be at least 8 characters long")
-    hashed = bcrypt.generate_password_hash(password).decode("utf-8")
+    hashed = _hash_password(password)
     role_enum = UserRole(role)
     user = User(name=name, hashed_password=hashed, role=role_enum)
     db.session.add(user)
-    db.session.commit()
+    commit_point()
     return user
 
 
@@ -64,13 +124,13 @@ def update_user(
         user.name = name
     if role:
         user.role = role
-    db.session.commit()
+    commit_point()
     return user
 
 
 def set_password(user: User, password: str) -> User:
     if len(password) < 8:
         raise ValueError("Password must be at least 8 characters long")
-    user.hashed_password = bcrypt.generate_password_hash(password).decode("utf-8")
-    db.session.commit()
+    user.hashed_password = _hash_password(password)
+    commit_point()
     return user
@@ -33,12 +33,27 @@ def paginate_select(
     safe_page = max(page, 1)
     safe_per_page = min(max(per_page, 1), max_per_page)
 
-    total_query = select(func.count()).select_from(query.order_by(None).subquery())
-    total = db.session.execute(total_query).scalar_one()
-
-    stmt = query.limit(safe_per_page).offset((safe_page - 1) * safe_per_page)
-    result = db.session.execute(stmt)
-    items = list(result.scalars())
+    # COUNT(*) OVER () приклеивает общее число строк к каждой строке
+    # страницы: фильтры и join'ы выполняются один раз вместо отдельного
+    # count-подзапроса со вторым round-trip'ом.
+    stmt = (
+        query.add_columns(func.count().over().label("_total"))
+        .limit(safe_per_page)
+        .offset((safe_page - 1) * safe_per_page)
+    )
+    rows = db.session.execute(stmt).all()
+
+    if rows:
+        items = [row[0] for row in rows]
+        total = rows[0]._total
+    else:
+        items = []
+        total = 0
+        if safe_page > 1:
+            # Страница за пределами выборки: окно не вернуло строк,
+            # поэтому total добираем отдельным count'ом.
+            total_query = select(func.count()).select_from(query.order_by(None).subquery())
+            total = db.session.execute(total_query).scalar_one()
 
     return Page(items=items, total=total, page=safe_page, per_page=safe_per_page)
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 from pathlib import Path
 from typing import Tuple
 from urllib.parse import urljoin
@@ -22,12 +23,23 @@ def generate_room_qr(room_id: int) -> Tuple[str, str]:
 
     target_url = urljoin(target_base, f"rooms/{room_id}")
 
-    file_name = f"{room_id}.png"
+    # Контентная адресация: digest URL в имени файла. Пока URL комнаты не
+    # меняется, повторный sync не перекодирует PNG (PIL-энкодинг — чистый
+    # CPU), а смена базового URL автоматически даёт новое имя файла.
+    digest = hashlib.sha1(target_url.encode("utf-8")).hexdigest()[:16]
+    file_name = f"{room_id}-{digest}.png"
     file_path = qr_dir / file_name
 
     # TODO: добавить подпись QR-кода для слабовидящих пользователей
-    image = qrcode.make(target_url)
-    image.save(file_path)
+    if not file_path.exists():
+        qr = qrcode.QRCode(
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            box_size=6,
+            border=2,
+        )
+        qr.add_data(target_url)
+        qr.make(fit=True)
+        qr.make_image().save(file_path)
 
     public_path = f"static/qr/{file_name}"
     public_url = urljoin(app.config.get("SERVER_EXTERNAL_BASE", "http://localhost:5000/"), public_path)
@@ -0,0 +1,69 @@
+"""enum columns to varchar
+
+Revision ID: 3f8b2c5d9a10
+Revises: 11ce4f7af00e
+Create Date: 2026-08-27 10:12:03.117402
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8b2c5d9a10'
+down_revision = '11ce4f7af00e'
+branch_labels = None
+depends_on = None
+
+_COLUMNS = (
+    ('users', 'role', 'userrole', 16),
+    ('rooms', 'type', 'roomtype', 16),
+    ('reservations', 'status', 'reservationstatus', 16),
+    ('audit_logs', 'action', 'auditaction', 32),
+)
+
+
+def upgrade():
+    # ALTER COLUMN TYPE умеет только Postgres; на SQLite (dev) ненативные
+    # Enum-колонки и так созданы как VARCHAR — миграция там no-op.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table, column, type_name, length in _COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.String(length=length),
+            existing_nullable=False,
+            postgresql_using=f'{column}::text',
+        )
+        sa.Enum(name=type_name).drop(op.get_bind(), checkfirst=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    enum_values = {
+        'userrole': ('student', 'teacher', 'admin'),
+        'roomtype': ('public', 'admin', 'service'),
+        'reservationstatus': ('active', 'finished', 'cancelled'),
+        'auditaction': (
+            'create_reservation',
+            'cancel_reservation',
+            'update_reservation',
+            'update_room',
+            'create_user',
+            'login',
+            'logout',
+        ),
+    }
+    for table, column, type_name, _length in _COLUMNS:
+        enum_type = sa.Enum(*enum_values[type_name], name=type_name)
+        enum_type.create(op.get_bind(), checkfirst=True)
+        op.alter_column(
+            table,
+            column,
+            type_=enum_type,
+            existing_nullable=False,
+            postgresql_using=f'{column}::{type_name}',
+        )
@@ -0,0 +1,34 @@
+"""reservation composite indexes
+
+Revision ID: 7c1da4e6b2f3
+Revises: 3f8b2c5d9a10
+Create Date: 2026-08-27 14:05:41.582910
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1da4e6b2f3'
+down_revision = '3f8b2c5d9a10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_reservation_room_status_time',
+        'reservations',
+        ['room_id', 'status', 'start_time', 'end_time'],
+    )
+    op.create_index(
+        'ix_reservation_status_times',
+        'reservations',
+        ['status', 'start_time', 'end_time'],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_reservation_status_times', table_name='reservations')
+    op.drop_index('ix_reservation_room_status_time', table_name='reservations')
@@ -0,0 +1,27 @@
+"""functional lower(name) indexes
+
+Revision ID: 9e4f7a1c8d25
+Revises: 7c1da4e6b2f3
+Create Date: 2026-08-27 15:32:18.274006
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4f7a1c8d25'
+down_revision = '7c1da4e6b2f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_rooms_name_lower', 'rooms', [sa.text('lower(name)')])
+    op.create_index('ix_users_name_lower', 'users', [sa.text('lower(name)')])
+
+
+def downgrade():
+    op.drop_index('ix_users_name_lower', table_name='users')
+    op.drop_index('ix_rooms_name_lower', table_name='rooms')
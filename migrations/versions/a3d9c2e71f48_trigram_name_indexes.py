@@ -0,0 +1,40 @@
+"""trigram indexes for name search
+
+Revision ID: a3d9c2e71f48
+Revises: 9e4f7a1c8d25
+Create Date: 2026-08-27 16:48:55.107233
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d9c2e71f48'
+down_revision = '9e4f7a1c8d25'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Поиск идёт по lower(name) LIKE '%token%': ведущий wildcard не
+    # использует B-tree, GIN по триграммам — использует. Расширение и
+    # USING gin есть только в Postgres; на SQLite (dev) миграция — no-op.
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute(
+        'CREATE INDEX ix_rooms_name_trgm ON rooms USING gin (lower(name) gin_trgm_ops)'
+    )
+    op.execute(
+        'CREATE INDEX ix_users_name_trgm ON users USING gin (lower(name) gin_trgm_ops)'
+    )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    op.execute('DROP INDEX IF EXISTS ix_users_name_trgm')
+    op.execute('DROP INDEX IF EXISTS ix_rooms_name_trgm')
@@ -0,0 +1,41 @@
+"""reservation overlap exclusion constraint
+
+Revision ID: c8b51f02d7e9
+Revises: a3d9c2e71f48
+Create Date: 2026-08-27 17:21:09.663480
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8b51f02d7e9'
+down_revision = 'a3d9c2e71f48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # GiST-констрейнт атомарно запрещает пересечение активных броней одной
+    # комнаты: INSERT либо проходит, либо падает IntegrityError — без
+    # SELECT ... FOR UPDATE и его дедлоков. Колонки времени наивные
+    # (timestamp without time zone), поэтому tsrange, не tstzrange.
+    # На SQLite (dev) exclusion-констрейнтов нет — миграция no-op.
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.execute(
+        "ALTER TABLE reservations ADD CONSTRAINT no_reservation_overlap "
+        "EXCLUDE USING gist ("
+        "room_id WITH =, tsrange(start_time, end_time, '[)') WITH &&"
+        ") WHERE (status = 'active')"
+    )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    op.execute('ALTER TABLE reservations DROP CONSTRAINT IF EXISTS no_reservation_overlap')
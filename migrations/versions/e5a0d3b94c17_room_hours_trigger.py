@@ -0,0 +1,59 @@
+"""room booking hours trigger
+
+Revision ID: e5a0d3b94c17
+Revises: c8b51f02d7e9
+Create Date: 2026-08-27 18:02:37.449315
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a0d3b94c17'
+down_revision = 'c8b51f02d7e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Окно бронирования комнаты проверяется триггером на строке: контракт
+    # держит сама БД, и обойти его мимо сервисного слоя (bulk-апдейты,
+    # ручной SQL) больше нельзя. На SQLite (dev) — no-op, там остаётся
+    # Python-проверка _ensure_within_room_hours.
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION enforce_room_booking_hours() RETURNS trigger AS $$
+        DECLARE
+            b_start time;
+            b_end time;
+        BEGIN
+            SELECT booking_start, booking_end INTO b_start, b_end
+            FROM rooms WHERE id = NEW.room_id;
+            IF b_start IS NOT NULL AND NEW.start_time::time < b_start THEN
+                RAISE EXCEPTION 'Reservation starts before allowed time';
+            END IF;
+            IF b_end IS NOT NULL AND NEW.end_time::time > b_end THEN
+                RAISE EXCEPTION 'Reservation ends after allowed time';
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER trg_reservation_room_hours "
+        "BEFORE INSERT OR UPDATE OF start_time, end_time ON reservations "
+        "FOR EACH ROW EXECUTE FUNCTION enforce_room_booking_hours()"
+    )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    op.execute('DROP TRIGGER IF EXISTS trg_reservation_room_hours ON reservations')
+    op.execute('DROP FUNCTION IF EXISTS enforce_room_booking_hours()')
@@ -0,0 +1,35 @@
+"""partial index over active reservations
+
+Revision ID: f2c7e9a45b31
+Revises: e5a0d3b94c17
+Create Date: 2026-08-27 18:40:26.918754
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c7e9a45b31'
+down_revision = 'e5a0d3b94c17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Горячие запросы (доска статусов, конфликты, дашборд) читают только
+    # активные брони, но B-tree по всей таблице перемешивает их с годами
+    # отменённой истории. Частичный индекс WHERE status='active' держит
+    # живые строки в маленькой, всегда тёплой структуре.
+    op.create_index(
+        'ix_reservation_active_room_time',
+        'reservations',
+        ['room_id', 'start_time', 'end_time'],
+        postgresql_where=sa.text("status = 'active'"),
+        sqlite_where=sa.text("status = 'active'"),
+    )
+
+
+def downgrade():
+    op.drop_index('ix_reservation_active_room_time', table_name='reservations')
@@ -9,9 +9,11 @@ ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
+from sqlalchemy import insert, select
+
 from app import create_app
-from app.models import UserRole
-from app.services import users
+from app.extensions import bcrypt, db
+from app.models import User, UserRole
 
 
 DEFAULT_PASSWORD = "loadtest123"
@@ -27,17 +29,30 @@ class Config:
 
 def ensure_users(config: Config) -> None:
     app = create_app()
-    created = 0
-    skipped = 0
     with app.app_context():
-        for idx in range(config.count):
-            username = f"{config.prefix}{idx:03d}"
-            if users.get_user_by_name(username):
-                skipped += 1
-                continue
-            users.create_user(name=username, password=config.password, role=UserRole.student.value)
-            created += 1
-    print(f"Requested: {config.count}, created: {created}, skipped (already existed): {skipped}")
+        wanted = [f"{config.prefix}{idx:03d}" for idx in range(config.count)]
+        existing = set(
+            db.session.execute(select(User.name).filter(User.name.in_(wanted))).scalars()
+        )
+        missing = [name for name in wanted if name not in existing]
+
+        if missing:
+            # Пароль у всех аккаунтов общий — bcrypt считается один раз,
+            # а не ~100 мс на каждого пользователя; вставка одним
+            # executemany и одним COMMIT вместо запроса+коммита на строку.
+            hashed = bcrypt.generate_password_hash(config.password).decode("utf-8")
+            db.session.execute(
+                insert(User),
+                [
+                    {"name": name, "hashed_password": hashed, "role": UserRole.student}
+                    for name in missing
+                ],
+            )
+            db.session.commit()
+    print(
+        f"Requested: {config.count}, created: {len(missing)}, "
+        f"skipped (already existed): {len(existing)}"
+    )
 
 
 def parse_args() -> Config:
@@ -1,99 +1,189 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from sqlalchemy import insert, select, text
 
 from app import create_app
-from app.extensions import db
-from app.models import RoomType, UserRole
-from app.services import rooms, users
+from app.extensions import bcrypt, db
+from app.models import Reservation, ReservationStatus, Room, RoomType, User, UserRole
+from app.utils import generate_room_qr
+
+_USER_SEEDS = (
+    ('admin', 'admin1234', UserRole.admin),
+    ('teacher', 'teacher1234', UserRole.teacher),
+    ('student', 'student1234', UserRole.student),
+    ('guest', 'guest1234', UserRole.student),
+)
+
+
+def seed_users(users_by_name: dict[str, User]):
+    # Существующие пользователи уже загружены одним SELECT в run() — здесь
+    # остаётся только executemany-INSERT недостающих
+    # (см. scripts/generate_test_users.py). RETURNING кладёт новые объекты
+    # в ту же карту, чтобы seed_reservations не перечитывал их из БД.
+    missing = [seed for seed in _USER_SEEDS if seed[0] not in users_by_name]
+    if not missing:
+        return
 
+    # bcrypt считает хеш в C и отпускает GIL — четыре хеша по ~100 мс
+    # выполняются параллельно, а не друг за другом. flask_bcrypt читает
+    # cost из current_app, поэтому рабочим потокам нужен app context.
+    app = current_app._get_current_object()
 
-def seed_users():
-    if not users.get_user_by_name('admin'):
-        users.create_user(name='admin', password='admin1234', role=UserRole.admin.value)
-    if not users.get_user_by_name('teacher'):
-        users.create_user(name='teacher', password='teacher1234', role=UserRole.teacher.value)
-    if not users.get_user_by_name('student'):
-        users.create_user(name='student', password='student1234', role=UserRole.student.value)
-    if not users.get_user_by_name('guest'):
-        users.create_user(name='guest', password='guest1234', role=UserRole.student.value)
+    def _hash(password: str) -> str:
+        with app.app_context():
+            return bcrypt.generate_password_hash(password).decode('utf-8')
 
+    with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+        hashes = list(executor.map(_hash, [password for _, password, _ in missing]))
 
-def seed_rooms():
-    existing = {room.name: room for room in rooms.list_rooms()}
-    defaults = [
-        ('B101', RoomType.public),
-        ('B102', RoomType.public),
-        ('A200', RoomType.admin),
-        ('S001', RoomType.service),
+    rows = [
+        {'name': name, 'hashed_password': hashed, 'role': role}
+        for (name, _, role), hashed in zip(missing, hashes)
     ]
-    for name, room_type in defaults:
-        if name not in existing:
-            room = rooms.create_room(name=name, room_type=room_type)
-            rooms.sync_room_qr(room)
+    for user in db.session.scalars(insert(User).returning(User), rows):
+        users_by_name[user.name] = user
 
 
-def seed_reservations():
-    from app.services import reservations
+_ROOM_SEEDS = (
+    ('B101', RoomType.public),
+    ('B102', RoomType.public),
+    ('A200', RoomType.admin),
+    ('S001', RoomType.service),
+)
 
-    teacher = users.get_user_by_name('teacher')
-    student = users.get_user_by_name('student')
-    guest = users.get_user_by_name('guest')
+
+def seed_rooms():
+    # INSERT .. ON CONFLICT DO NOTHING (поддерживается и Postgres, и SQLite)
+    # заменяет пару SELECT+INSERT одним стейтментом и закрывает гонку при
+    # конкурентном посеве; RETURNING отдаёт только реально вставленные
+    # комнаты — именно им нужен QR. У users такой опоры нет: users.name не
+    # уникален на уровне схемы, поэтому там остаётся предвыборка.
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    stmt = (
+        dialect_insert(Room)
+        .values([{'name': name, 'type': room_type} for name, room_type in _ROOM_SEEDS])
+        .on_conflict_do_nothing(index_elements=['name'])
+        .returning(Room)
+    )
+    new_rooms = db.session.scalars(stmt).all()
+    if not new_rooms:
+        return
+    # Рендер QR — чистый файловый I/O без обращения к сессии, поэтому PNG
+    # пишутся параллельно; URL присваиваются в главном потоке, а фиксирует
+    # всё общий COMMIT в run() — без коммита на комнату, как в
+    # rooms.sync_room_qr.
+    app = current_app._get_current_object()
+
+    def _render_qr(room_id: int) -> str:
+        # generate_room_qr читает конфиг через current_app — рабочим потокам
+        # нужен свой app context.
+        with app.app_context():
+            return generate_room_qr(room_id)[1]
+
+    room_ids = [room.id for room in new_rooms]
+    with ThreadPoolExecutor(max_workers=min(8, len(room_ids))) as executor:
+        urls = list(executor.map(_render_qr, room_ids))
+    for room, public_url in zip(new_rooms, urls):
+        room.qr_code_url = public_url
+
+
+def _hour_offset_sql(minutes: int):
+    """Усечённое до часа UTC-"сейчас" плюс сдвиг, посчитанные самой БД.
+
+    Раньше datetime-арифметика делалась в Python и литералы гнались по
+    проводу; SQL-выражение считается на стороне БД и остаётся наивным UTC,
+    как и остальные метки времени в приложении.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        return text(f"date_trunc('hour', now() at time zone 'utc') + interval '{minutes} minutes'")
+    sign = '+' if minutes >= 0 else '-'
+    return text(f"datetime(strftime('%Y-%m-%d %H:00:00','now'), '{sign}{abs(minutes)} minutes')")
+
+
+def seed_reservations(users_by_name: dict[str, User]):
+    teacher = users_by_name.get('teacher')
+    student = users_by_name.get('student')
+    guest = users_by_name.get('guest')
     if not teacher or not student:
         return
 
-    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0, tzinfo=None)
-
-    def ensure_booking(room_name: str, *, user_id: int, start: datetime, end: datetime) -> None:
-        room_obj = rooms.get_room_by_name(room_name)
-        if not room_obj:
-            return
-        duration = end - start
-        now_local = datetime.utcnow()
-        create_start = start if start >= now_local else now_local + timedelta(minutes=5)
-        create_end = create_start + duration
-        try:
-            reservation = reservations.create_reservation(
-                room=room_obj,
-                user_id=user_id,
-                start=create_start,
-                end=create_end,
-            )
-            reservation.start_time = start
-            reservation.end_time = end
-            db.session.commit()
-        except ValueError:
-            pass
-
-    ensure_booking(
-        'B101',
-        user_id=teacher.id,
-        start=now - timedelta(minutes=30),
-        end=now + timedelta(hours=1, minutes=30),
-    )
+    # Раньше каждая бронь проходила через create_reservation (конфликт-чек,
+    # INSERT, COMMIT), после чего времена тут же переписывались вторым
+    # коммитом. Теперь окна задаются сдвигами в минутах, которые считает БД,
+    # а строки уходят одним INSERT, минуя сервисный слой.
+    rooms_by_name = {
+        room.name: room
+        for room in db.session.execute(
+            select(Room).filter(Room.name.in_(('B101', 'B102', 'A200')))
+        ).scalars()
+    }
+
+    wanted = [
+        ('B101', teacher.id, -30, 90),
+        ('B102', student.id, 120, 240),
+    ]
+    if guest:
+        wanted.append(('A200', guest.id, 360, 480))
+
+    rows = [
+        {
+            'room_id': rooms_by_name[room_name].id,
+            'user_id': user_id,
+            'start_time': _hour_offset_sql(start_min),
+            'end_time': _hour_offset_sql(end_min),
+            'status': ReservationStatus.active,
+        }
+        for room_name, user_id, start_min, end_min in wanted
+        if room_name in rooms_by_name
+    ]
 
-    ensure_booking(
-        'B102',
-        user_id=student.id,
-        start=now + timedelta(hours=2),
-        end=now + timedelta(hours=4),
+    # Идемпотентность: комнаты, где активная бронь уже есть, пропускаем —
+    # раньше эту роль играл конфликт-чек create_reservation.
+    booked = set(
+        db.session.execute(
+            select(Reservation.room_id).filter(
+                Reservation.room_id.in_([row['room_id'] for row in rows]),
+                Reservation.status == ReservationStatus.active,
+            )
+        ).scalars()
     )
-
-    if guest:
-        ensure_booking(
-            'A200',
-            user_id=guest.id,
-            start=now + timedelta(hours=6),
-            end=now + timedelta(hours=8),
-        )
+    rows = [row for row in rows if row['room_id'] not in booked]
+    if rows:
+        # Core-insert по таблице: без identity map, инстансов и ORM-событий —
+        # посевным строкам они не нужны. Идём через session, а не через
+        # отдельный engine.begin(), чтобы остаться в единой транзакции run().
+        # .values(rows): executemany не умеет SQL-выражения в параметрах,
+        # один multi-row INSERT — умеет.
+        db.session.execute(Reservation.__table__.insert().values(rows))
 
 
 def run():
     app = create_app()
     with app.app_context():
-        seed_users()
-        seed_rooms()
-        seed_reservations()
+        # Весь посев — одна транзакция и один COMMIT (один fsync) вместо
+        # коммита на функцию. autoflush выключен: вставки уходят явными
+        # execute, и промежуточным SELECT'ам нечего флашить.
+        with db.session.no_autoflush:
+            # Пользователи резолвятся одним SELECT на весь посев: карта
+            # передаётся вниз вместо семи точечных get_user_by_name.
+            wanted = [name for name, _, _ in _USER_SEEDS]
+            users_by_name = {
+                user.name: user
+                for user in db.session.execute(
+                    select(User).filter(User.name.in_(wanted))
+                ).scalars()
+            }
+            seed_users(users_by_name)
+            seed_rooms()
+            seed_reservations(users_by_name)
+            db.session.commit()
         print('Seed completed')
 
 
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import logging
 import os
 import random
-import threading
+import time
 from datetime import datetime, timedelta
-from itertools import cycle
+from itertools import count
 
-from locust import HttpUser, between, task
+from locust import LoadTestShape, between, events, task
+from locust.contrib.fasthttp import FastHttpUser
+
+# На пике (тысячи VU × ~1 rps) пер-запросные логи съедают CPU генератора и
+# сами становятся узким местом. Оставляем только предупреждения; агрегаты
+# на запуске лучше снимать флагами `--only-summary --reset-stats --csv=...`.
+logging.getLogger("locust").setLevel(logging.WARNING)
+logging.getLogger("urllib3").setLevel(logging.ERROR)
 
 
 USER_PREFIX = os.getenv("LOADTEST_USER_PREFIX", "load_student_")
@@ -16,23 +24,71 @@ RESERVATION_MIN_OFFSET_MIN = int(os.getenv("LOADTEST_MIN_OFFSET_MIN", "30"))
 RESERVATION_MAX_OFFSET_MIN = int(os.getenv("LOADTEST_MAX_OFFSET_MIN", "720"))
 RESERVATION_DURATION_MIN = int(os.getenv("LOADTEST_DURATION_MIN", "45"))
 
-
-class QRBooksUser(HttpUser):
+# Один процесс Python упирается в одно ядро задолго до 4000 VU — нагрузку
+# нужно раздавать master/worker-запуском (500-1000 VU на worker):
+#
+#   locust -f tests/load/locustfile.py --master --host=<url>
+#   LOADTEST_WORKERS=4 LOCUST_WORKER_INDEX=<i> \
+#       locust -f tests/load/locustfile.py --worker --master-host=<host>
+#
+# Каждый worker берёт свой срез пула логинов по индексу, чтобы процессы не
+# делили одни и те же аккаунты.
+_WORKER_COUNT = max(1, int(os.getenv("LOADTEST_WORKERS", "1")))
+_WORKER_INDEX = int(os.getenv("LOCUST_WORKER_INDEX", "0")) % _WORKER_COUNT
+_POOL_SLICE = max(1, USER_POOL_SIZE // _WORKER_COUNT)
+_POOL_BASE = _WORKER_INDEX * _POOL_SLICE
+
+# Тело POST /rooms/<id>/reserve меняется только в двух полях — байтовый
+# шаблон с %b-подстановкой дешевле, чем json.dumps по словарю на каждый
+# запрос.
+_RESERVE_TEMPLATE = b'{"start_time":"%b","end_time":"%b"}'
+
+
+# FastHttpUser (geventhttpclient) держит keep-alive соединения per-greenlet
+# и на тысячах виртуальных пользователей даёт в разы больше RPS с того же
+# ядра генератора, чем requests-клиент HttpUser: нагрузка упирается в
+# сервер, а не в клиент.
+class QRBooksUser(FastHttpUser):
     wait_time = between(0.5, 1.5)
+    network_timeout = 10.0
+    connection_timeout = 5.0
+    # Один виртуальный пользователь = одно постоянное keep-alive соединение:
+    # задачи идут последовательно, пул из нескольких сокетов на пользователя
+    # лишь плодит хендшейки и давит на accept-очередь сервера.
+    concurrency = 1
+
+    # next() по itertools.count — один атомарный байткод под GIL, так что
+    # раздача имён не нуждается в Lock, который на ramp-up с тысячами
+    # виртуальных пользователей становился точкой контеншена.
+    _user_counter = count()
+    _public_room_ids: tuple[int, ...] = ()
+    _n_rooms = 0
+
+    # Кольцо заранее насэмплированных (offset, добавка к длительности):
+    # вместо трёх вызовов Mersenne Twister на задачу — инкремент счётчика и
+    # выборка кортежа. Размер — степень двойки, чтобы брать индекс по маске.
+    _SAMPLE_POOL_SIZE = 8192
+    _sample_pool = tuple(
+        (
+            random.randint(RESERVATION_MIN_OFFSET_MIN, RESERVATION_MAX_OFFSET_MIN),
+            random.randint(0, 30),
+        )
+        for _ in range(_SAMPLE_POOL_SIZE)
+    )
+    _sample_idx = count()
 
-    _user_iterator = cycle(range(USER_POOL_SIZE))
-    _lock = threading.Lock()
-    _public_room_ids: list[int] | None = None
+    # Усечённое до минуты "сейчас" обновляется раз в 30 секунд по
+    # monotonic-часам: минимальный сдвиг брони — 30 минут, так что точность
+    # достаточна, а тысячи gettimeofday+datetime-арифметики в секунду с
+    # горячего пути уходят. Чтение/запись слотов списка атомарны под GIL.
+    _now_cached: list = [None, 0.0]
 
     def on_start(self) -> None:
         self.username = self._acquire_username()
         self._authenticate()
-        if QRBooksUser._public_room_ids is None:
-            self._warm_up_rooms()
 
     def _acquire_username(self) -> str:
-        with QRBooksUser._lock:
-            next_idx = next(QRBooksUser._user_iterator)
+        next_idx = _POOL_BASE + next(QRBooksUser._user_counter) % _POOL_SLICE
         return f"{USER_PREFIX}{next_idx:03d}"
 
     def _authenticate(self) -> None:
@@ -46,56 +102,119 @@ class QRBooksUser(HttpUser):
         )
         if response.status_code != 200:
             response.raise_for_status()
-        self._csrf_access_token = self.client.cookies.get("csrf_access_token")
-        self._csrf_refresh_token = self.client.cookies.get("csrf_refresh_token")
-
-    def _csrf_headers(self) -> dict[str, str]:
-        headers: dict[str, str] = {}
-        if self._csrf_access_token:
-            headers["X-CSRF-TOKEN"] = self._csrf_access_token
-        return headers
-
-    def _warm_up_rooms(self) -> None:
-        response = self.client.get("/rooms", name="rooms_list")
-        response.raise_for_status()
-        payload = response.json()
-        QRBooksUser._public_room_ids = [
-            room["id"] for room in payload.get("rooms", []) if room.get("type") == "public"
-        ]
-        if not QRBooksUser._public_room_ids:
-            raise RuntimeError("No public rooms available for load test.")
-
+        self._csrf_access_token = self._cookie_value("csrf_access_token")
+        self._csrf_refresh_token = self._cookie_value("csrf_refresh_token")
+        # Заголовки CSRF не меняются до конца сессии пользователя — словарь
+        # собирается один раз здесь, а не на каждом запросе в задачах.
+        self._csrf_headers_cached = (
+            {"X-CSRF-TOKEN": self._csrf_access_token} if self._csrf_access_token else {}
+        )
+        self._post_headers = {**self._csrf_headers_cached, "Content-Type": "application/json"}
+
+    def _cookie_value(self, name: str) -> str | None:
+        # У FastHttpUser нет requests-овского .cookies — читаем cookiejar.
+        for cookie in self.client.cookiejar:
+            if cookie.name == name:
+                return cookie.value
+        return None
+
+    # Задачам тело ответа не нужно: catch_response + stream оставляют только
+    # проверку статуса, без скачивания и JSON-парсинга payload'а — меньше
+    # CPU и аллокаций на стороне генератора нагрузки.
     @task(4)
     def list_rooms(self) -> None:
-        self.client.get("/rooms", name="rooms_list")
+        with self.client.get(
+            "/rooms", name="rooms_list", catch_response=True, stream=True
+        ) as response:
+            if response.status_code == 200:
+                response.success()
+            else:
+                response.failure(f"status {response.status_code}")
 
     @task(2)
     def view_my_reservations(self) -> None:
-        self.client.get("/reservations/mine", name="reservations_mine")
+        with self.client.get(
+            "/reservations/mine", name="reservations_mine", catch_response=True, stream=True
+        ) as response:
+            if response.status_code == 200:
+                response.success()
+            else:
+                response.failure(f"status {response.status_code}")
 
     @task(1)
     def create_reservation(self) -> None:
         if not QRBooksUser._public_room_ids:
             return
-        room_id = random.choice(QRBooksUser._public_room_ids)
-        now = datetime.utcnow().replace(second=0, microsecond=0)
-        offset = random.randint(RESERVATION_MIN_OFFSET_MIN, RESERVATION_MAX_OFFSET_MIN)
-        duration = RESERVATION_DURATION_MIN + random.randint(0, 30)
+        # random.random()*n + индекс по кортежу дешевле random.choice по
+        # списку: одно умножение вместо вызова с bounds-check'ом.
+        ids = QRBooksUser._public_room_ids
+        room_id = ids[int(random.random() * QRBooksUser._n_rooms)]
+        cache = QRBooksUser._now_cached
+        ticks = time.monotonic()
+        if cache[0] is None or ticks - cache[1] > 30.0:
+            cache[0] = datetime.utcnow().replace(second=0, microsecond=0)
+            cache[1] = ticks
+        now = cache[0]
+        offset, extra = self._sample_pool[next(self._sample_idx) & (self._SAMPLE_POOL_SIZE - 1)]
+        duration = RESERVATION_DURATION_MIN + extra
         start_time = now + timedelta(minutes=offset)
         end_time = start_time + timedelta(minutes=duration)
-        payload = {
-            "start_time": start_time.isoformat(),
-            "end_time": end_time.isoformat(),
-        }
-        response = self.client.post(
+        body = _RESERVE_TEMPLATE % (
+            start_time.isoformat().encode(),
+            end_time.isoformat().encode(),
+        )
+        with self.client.post(
             f"/rooms/{room_id}/reserve",
-            json=payload,
-            headers=self._csrf_headers(),
+            data=body,
+            headers=self._post_headers,
             name="rooms_reserve",
-        )
-        if response.status_code not in (201, 400, 401, 403, 409, 429):
-            response.raise_for_status()
+            catch_response=True,
+        ) as response:
+            if response.status_code in (201, 400, 401, 403, 409, 429):
+                response.success()
+            else:
+                response.failure(f"status {response.status_code}")
 
     def on_stop(self) -> None:
-        self.client.post("/auth/logout", headers=self._csrf_headers(), name="auth_logout")
+        self.client.post("/auth/logout", headers=self._csrf_headers_cached, name="auth_logout")
+
+
+@events.test_start.add_listener
+def _warm_up_rooms(environment, **_kwargs) -> None:
+    # Список публичных комнат забирается один раз до спавна виртуальных
+    # пользователей: раньше сотни on_start наперегонки били в /rooms,
+    # устраивая thundering herd и ложный пик rooms_list в t=0.
+    import requests
+
+    response = requests.get(f"{environment.host}/rooms", timeout=10)
+    response.raise_for_status()
+    QRBooksUser._public_room_ids = tuple(
+        room["id"] for room in response.json().get("rooms", []) if room.get("type") == "public"
+    )
+    QRBooksUser._n_rooms = len(QRBooksUser._public_room_ids)
+    if not QRBooksUser._public_room_ids:
+        raise RuntimeError("No public rooms available for load test.")
+
+
+# Ступенчатый ramp-up вместо залпового спавна: TCP/TLS-хендшейки и залп
+# /auth/login размазываются по времени, и steady-state-замеры не
+# загрязняются стартовым штормом. Ступени (длительность, пользователи,
+# скорость спавна) настраиваются через env: "60:500:50,120:1500:100,...".
+_RAMP_STAGES = tuple(
+    tuple(int(part) for part in stage.split(":"))
+    for stage in os.getenv(
+        "LOADTEST_RAMP_STAGES", "60:500:50,120:1500:100,300:4000:100"
+    ).split(",")
+)
+
+
+class GradualLoad(LoadTestShape):
+    def tick(self) -> tuple[int, int] | None:
+        run_time = self.get_run_time()
+        elapsed = 0
+        for duration, users, spawn_rate in _RAMP_STAGES:
+            elapsed += duration
+            if run_time < elapsed:
+                return users, spawn_rate
+        return None
 